@@ -0,0 +1,142 @@
+"""Partition event table by month
+
+Revision ID: a7af40e57827
+Revises: 5049f0780f90
+Create Date: 2026-10-18 10:11:44.521309
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "a7af40e57827"
+down_revision = "5049f0780f90"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    "created_at, updated_at, event_type, payload, id, "
+    "actor_id, organization_id, item_id, model_id"
+)
+# Months created past the current one; app.event_partitions adds more later
+MONTHS_AHEAD = 3
+
+
+def create_event_table(name, partitioned):
+    op.create_table(
+        name,
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "event_type", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False
+        ),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("actor_id", sa.Uuid(), nullable=True),
+        sa.Column("organization_id", sa.Uuid(), nullable=True),
+        sa.Column("item_id", sa.Uuid(), nullable=True),
+        sa.Column("model_id", sa.Uuid(), nullable=True),
+        sa.ForeignKeyConstraint(["actor_id"], ["user.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["item_id"], ["item.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["model_id"], ["aimodel.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(
+            ["organization_id"], ["organization.id"], ondelete="SET NULL"
+        ),
+        sa.PrimaryKeyConstraint("id", "created_at")
+        if partitioned
+        else sa.PrimaryKeyConstraint("id"),
+        **({"postgresql_partition_by": "RANGE (created_at)"} if partitioned else {}),
+    )
+    op.create_index("ix_event_actor_id", name, ["actor_id"], unique=False)
+    op.create_index("ix_event_event_type", name, ["event_type"], unique=False)
+    op.create_index("ix_event_item_id", name, ["item_id"], unique=False)
+    op.create_index("ix_event_organization_id", name, ["organization_id"], unique=False)
+    op.create_index("ix_event_created_at_id", name, ["created_at", "id"], unique=False)
+    op.create_index(
+        "ix_event_payload",
+        name,
+        ["payload"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"payload": "jsonb_path_ops"},
+    )
+
+
+def drop_event_indexes(name, *extra):
+    # Free the index and constraint names for the rebuilt table; the old one
+    # is only read from before it is dropped
+    for index in (
+        "ix_event_actor_id",
+        "ix_event_event_type",
+        "ix_event_item_id",
+        "ix_event_organization_id",
+        "ix_event_created_at_id",
+        "ix_event_payload",
+        *extra,
+    ):
+        op.drop_index(index, table_name=name)
+    for column in ("actor_id", "item_id", "model_id", "organization_id"):
+        op.drop_constraint(f"event_{column}_fkey", name, type_="foreignkey")
+
+
+def upgrade():
+    # Postgres cannot partition a table in place: rebuild it and copy the rows.
+    # The created_at and updated_at indexes are not recreated; created_at is
+    # covered by ix_event_created_at_id and events are never updated.
+    op.rename_table("event", "event_unpartitioned")
+    op.execute(
+        "ALTER TABLE event_unpartitioned RENAME CONSTRAINT event_pkey TO event_unpartitioned_pkey"
+    )
+    drop_event_indexes(
+        "event_unpartitioned", "ix_event_created_at", "ix_event_updated_at"
+    )
+    create_event_table("event", partitioned=True)
+
+    op.execute("CREATE TABLE event_default PARTITION OF event DEFAULT")
+    op.execute(f"""
+        DO $$
+        DECLARE month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce(
+                        (SELECT min(created_at) FROM event_unpartitioned),
+                        now() AT TIME ZONE 'UTC'
+                    )),
+                    date_trunc('month', now() AT TIME ZONE 'UTC')
+                        + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF event FOR VALUES FROM (%L) TO (%L)',
+                    'event_' || to_char(month, 'YYYY_MM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+    op.execute(
+        f"INSERT INTO event ({COLUMNS}) SELECT {COLUMNS} FROM event_unpartitioned"
+    )
+    op.drop_table("event_unpartitioned")
+
+
+def downgrade():
+    op.rename_table("event", "event_partitioned")
+    drop_event_indexes("event_partitioned")
+    op.execute(
+        "ALTER TABLE event_partitioned RENAME CONSTRAINT event_pkey TO event_partitioned_pkey"
+    )
+    create_event_table("event", partitioned=False)
+    op.create_index(op.f("ix_event_created_at"), "event", ["created_at"], unique=False)
+    op.create_index(op.f("ix_event_updated_at"), "event", ["updated_at"], unique=False)
+    op.execute(f"INSERT INTO event ({COLUMNS}) SELECT {COLUMNS} FROM event_partitioned")
+    # Drops the partitions with it
+    op.drop_table("event_partitioned")
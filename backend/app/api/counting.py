@@ -0,0 +1,61 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.models import CountMode
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, with its parameters bound as usual."""
+
+    # Cached compilations would map the result onto the inner SELECT's columns
+    inherit_cache = False
+
+    def __init__(self, statement: ClauseElement) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+async def estimate_rows(session: AsyncSession, statement: SelectOfScalar[Any]) -> int:
+    """Ask the planner how many rows ``statement`` returns, without running it."""
+    # Executed like the statement itself, so expanding IN lists and type
+    # bind processors (e.g. JSONB) apply
+    connection = await session.connection()
+    plan = (await connection.execute(Explain(statement))).scalar_one()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(
+    session: AsyncSession,
+    statement: SelectOfScalar[Any],
+    mode: CountMode,
+    *,
+    cached: Callable[[], Awaitable[int]] | None = None,
+) -> tuple[int | None, CountMode]:
+    """
+    Count the rows matched by the (unpaginated) listing ``statement``.
+
+    ``cached`` reads a maintained counter and is only passed when one exists for
+    the exact filter being listed; otherwise the cached mode degrades to an
+    estimate. Returns the count together with the mode actually used.
+    """
+    if mode is CountMode.none:
+        return None, mode
+    if mode is CountMode.cached:
+        if cached is not None:
+            return await cached(), mode
+        mode = CountMode.estimated
+    if mode is CountMode.estimated:
+        return await estimate_rows(session, statement), mode
+    count_statement = select(func.count()).select_from(statement.subquery())
+    return (await session.exec(count_statement)).one(), mode
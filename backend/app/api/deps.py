@@ -1,55 +1,296 @@
-from collections.abc import Generator
+import hashlib
+import math
+import time
+import uuid
+from collections.abc import AsyncGenerator, Generator
+from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Request, Response, Security, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer, SecurityScopes
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
-from sqlmodel import Session
+from sqlalchemy import ColumnElement, or_
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core import security
+from app.core import db, security
+from app.core.api_keys import (
+    CachedAPIKey,
+    api_key_cache,
+    api_key_usage,
+    hash_api_key,
+    unknown_api_key_cache,
+)
+from app.core.audit import audit_actor
+from app.core.cache import recent_writers, token_cache, user_cache
 from app.core.config import settings
-from app.core.db import engine
-from app.models import TokenPayload, User
+from app.core.db import ReplicaSession, async_engine, engine
+from app.models import APIKey, Item, MembershipRole, TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
-    tokenUrl=f"{settings.API_V1_STR}/login/access-token"
+    tokenUrl=f"{settings.API_V1_STR}/login/access-token", auto_error=False
 )
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+# Set on writes to the end of the writer's REPLICA_STICKY_SECONDS window
+PRIMARY_READS_COOKIE = "read_primary_until"
 
 
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # Objects stay loaded after commit: lazy refreshes cannot run implicitly
+    # under asyncio, and responses are serialized after the handler returns.
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_read_db(
+    request: Request, session: Annotated[AsyncSession, Depends(get_async_db)]
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only routes, served by the replica when one is configured.
+
+    Users who wrote within ``REPLICA_STICKY_SECONDS`` read from the primary so
+    they see their own changes. Without a replica this is the request's
+    primary session.
+    """
+    if db.replica_async_engine is None:
         yield session
+        return
+
+    def use_primary() -> bool:
+        # The cookie reaches every worker; the in-process map also covers
+        # clients that do not keep cookies, on the worker they wrote through
+        try:
+            until = float(request.cookies.get(PRIMARY_READS_COOKIE, ""))
+        except ValueError:
+            until = 0
+        now = time.time()
+        if now < until <= now + settings.REPLICA_STICKY_SECONDS:
+            return True
+        # Set by get_current_principal, which has run by the time the handler
+        # issues its first query
+        user_id = getattr(request.state, "user_id", None)
+        return user_id is not None and recent_writers.get(str(user_id)) is not None
+
+    async with AsyncSession(
+        async_engine,
+        expire_on_commit=False,
+        sync_session_class=ReplicaSession,
+        info={"use_primary": use_primary},
+    ) as read_session:
+        yield read_session
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
-TokenDep = Annotated[str, Depends(reusable_oauth2)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
+TokenDep = Annotated[str | None, Depends(reusable_oauth2)]
+APIKeyDep = Annotated[str | None, Depends(api_key_header)]
+
+
+@dataclass
+class Principal:
+    """The authenticated user with their role in each organization."""
 
+    user: User
+    roles: dict[uuid.UUID, MembershipRole] = field(default_factory=dict)
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+    def role_in(self, organization_id: uuid.UUID | None) -> MembershipRole | None:
+        return self.roles.get(organization_id) if organization_id else None
+
+    def can_read_item(
+        self, owner_id: uuid.UUID, organization_id: uuid.UUID | None
+    ) -> bool:
+        """Superusers, the owner and members of the item's organization."""
+        return (
+            self.user.is_superuser
+            or owner_id == self.user.id
+            or self.role_in(organization_id) is not None
         )
-        token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
+
+    def visible_items(self) -> list[ColumnElement[bool]]:
+        """WHERE clauses restricting an item query to what ``can_read_item`` allows."""
+        if self.user.is_superuser:
+            return []
+        owned = col(Item.owner_id) == self.user.id
+        if not self.roles:
+            return [owned]
+        return [or_(owned, col(Item.organization_id).in_(self.roles))]
+
+
+async def load_principal(session: AsyncSession, user_id: uuid.UUID) -> Principal | None:
+    """
+    Load a user and their memberships in one query, or from the in-process cache.
+
+    Code changing a user's row or memberships must call ``invalidate_user``.
+    """
+    cached = user_cache.get(str(user_id))
+    if cached is not None:
+        snapshot, roles = cached
+        # Attach the cached row to the session without a SELECT, so handlers
+        # can still update or delete it
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        session.add(user)
+        return Principal(user=user, roles=dict(roles))
+    generation = user_cache.generation
+    statement = (
+        select(User).where(User.id == user_id).options(joinedload(User.memberships))  # type: ignore[arg-type]
+    )
+    found = (await session.exec(statement)).unique().first()
+    if not found:
+        return None
+    roles = {m.organization_id: m.role for m in found.memberships}
+    if found.is_active:
+        user_cache.set(
+            str(found.id), (found.model_dump(), roles), generation=generation
+        )
+    return Principal(user=found, roles=roles)
+
+
+def decode_token(token: str) -> TokenPayload:
+    """
+    Verify an access token and validate its claims.
+
+    Results are cached by token digest until the token expires, so repeated
+    requests with the same token skip signature checks and validation.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    token_data = token_cache.get(key)
+    if token_data is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
+            token_data = TokenPayload(**payload)
+        except (InvalidTokenError, ValidationError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate credentials",
+            )
+        if "exp" in payload:
+            token_cache.set(key, token_data, ttl=payload["exp"] - time.time())
+    return token_data
+
+
+async def resolve_api_key(session: AsyncSession, key: str) -> CachedAPIKey:
+    key_hash = hash_api_key(key)
+    api_key = api_key_cache.get(key_hash)
+    if api_key is None:
+        if unknown_api_key_cache.get(key_hash):
+            raise HTTPException(status_code=403, detail="Invalid API key")
+        generation = api_key_cache.generation
+        row = (
+            await session.exec(select(APIKey).where(APIKey.key_hash == key_hash))
+        ).first()
+        if row is None:
+            unknown_api_key_cache.set(key_hash, True)
+            raise HTTPException(status_code=403, detail="Invalid API key")
+        api_key = CachedAPIKey.from_row(row)
+        api_key_cache.set(key_hash, api_key, generation=generation)
+    if api_key.expires_at is not None and api_key.expires_at <= datetime.utcnow():
+        raise HTTPException(status_code=403, detail="API key expired")
+    return api_key
+
+
+async def get_current_principal(
+    request: Request,
+    response: Response,
+    security_scopes: SecurityScopes,
+    session: AsyncSessionDep,
+    token: TokenDep,
+    api_key: APIKeyDep,
+) -> Principal:
+    """
+    Authenticate with a bearer token or an `X-API-Key` header.
+
+    Scopes declared with `Security(get_current_user, scopes=[...])` restrict
+    API keys only; login tokens carry all of their user's permissions. API
+    keys are rejected on routes that declare no scope.
+    """
+    if api_key is not None:
+        resolved = await resolve_api_key(session, api_key)
+        if not security_scopes.scopes:
+            raise HTTPException(
+                status_code=403, detail="API keys are not accepted on this route"
+            )
+        missing = [s for s in security_scopes.scopes if s not in resolved.scopes]
+        if missing:
+            raise HTTPException(
+                status_code=403,
+                detail=f"API key is missing scopes: {', '.join(missing)}",
+            )
+        api_key_usage.record(resolved.id)
+        user_id = resolved.user_id
+    elif token is not None:
+        try:
+            user_id = uuid.UUID(decode_token(token).sub)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate credentials",
+            )
+    else:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-    user = session.get(User, token_data.sub)
-    if not user:
+    principal = await load_principal(session, user_id)
+    if not principal:
         raise HTTPException(status_code=404, detail="User not found")
-    if not user.is_active:
+    if not principal.user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return user
+    # Return the connection: scoped principals and read routes query through
+    # other sessions. The user stays attached for handlers sharing this one.
+    await session.commit()
+    request.state.user_id = user_id
+    audit_actor.set(user_id)
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        # Keep this user's reads on the primary while the write replicates
+        recent_writers.set(str(user_id), True)
+        response.set_cookie(
+            PRIMARY_READS_COOKIE,
+            f"{time.time() + settings.REPLICA_STICKY_SECONDS:.3f}",
+            max_age=math.ceil(settings.REPLICA_STICKY_SECONDS),
+            httponly=True,
+            samesite="lax",
+        )
+    return principal
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+ItemsReadPrincipal = Annotated[
+    Principal, Security(get_current_principal, scopes=["items:read"])
+]
+# The session ItemsReadPrincipal was loaded with: a request shares one
+# instance of a dependency among those declared under the same scopes
+ItemsReadSessionDep = Annotated[
+    AsyncSession, Security(get_async_db, scopes=["items:read"])
+]
+
+
+async def get_current_user(
+    principal: Annotated[Principal, Security(get_current_principal)],
+) -> User:
+    # Scopes declared on Security(get_current_user, ...) reach the principal
+    return principal.user
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
+ItemsReadUser = Annotated[User, Security(get_current_user, scopes=["items:read"])]
+ItemsWriteUser = Annotated[User, Security(get_current_user, scopes=["items:write"])]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+async def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
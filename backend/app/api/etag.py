@@ -0,0 +1,34 @@
+import hashlib
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over the ``repr`` of ``parts`` (timestamps, ids, counts...)."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def page_etag(rows: Iterable[Any], *parts: Any) -> str:
+    """ETag of a listing page: the version of every row on it plus ``parts``."""
+    versions = [(row.id, row.created_at, row.updated_at) for row in rows]
+    return make_etag(versions, *parts)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,55 @@
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from sqlmodel import SQLModel, col
+
+
+def parse_fields(fields: str | None, schema: type[SQLModel]) -> tuple[str, ...] | None:
+    """
+    Validate a comma separated ``fields`` query parameter against ``schema``.
+
+    Returns ``None`` when no projection was requested.
+    """
+    if fields is None:
+        return None
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [field for field in requested if field not in schema.model_fields]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields",
+        )
+    return requested
+
+
+def project(model: Any, fields: Iterable[str], *required: str) -> list[Any]:
+    """Columns of ``model`` to SELECT: the requested fields plus ``required`` ones."""
+    names = dict.fromkeys((*fields, *required))
+    return [col(getattr(model, name)) for name in names]
+
+
+@lru_cache(maxsize=256)
+def partial_schema(schema: type[SQLModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    """A copy of ``schema`` restricted to ``fields``, cached per combination."""
+    definitions: dict[str, Any] = {
+        name: (schema.model_fields[name].annotation, ...) for name in fields
+    }
+    return create_model(f"{schema.__name__}Partial", **definitions)
+
+
+def dump_partial(
+    schema: type[SQLModel], fields: tuple[str, ...], rows: Iterable[Any]
+) -> list[dict[str, Any]]:
+    """
+    Serialize projected rows with the partial schema.
+
+    Routes return the result in a ``JSONResponse`` so FastAPI does not validate
+    it against the full ``response_model``.
+    """
+    partial = partial_schema(schema, fields)
+    return [
+        partial.model_validate(row._mapping).model_dump(mode="json") for row in rows
+    ]
@@ -0,0 +1,54 @@
+import json
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement
+
+
+def _nest(path: list[str], value: Any) -> dict[str, Any]:
+    for key in reversed(path[1:]):
+        value = {key: value}
+    return {path[0]: value}
+
+
+def jsonb_filters(
+    column: Any, expressions: list[str] | None
+) -> list[ColumnElement[bool]]:
+    """
+    Compile JSONB filter expressions into SQL conditions on ``column``.
+
+    Supported forms (dotted keys address nested objects):
+
+    * ``{"a": {"b": 1}}`` - containment, ``column @> '{"a": {"b": 1}}'``
+    * ``a.b:1`` - key equals; the value is parsed as JSON when it can be,
+      otherwise taken as a string. Compiled to containment as well.
+    * ``a.b`` - key exists, ``column -> 'a' ? 'b'``
+
+    Containment and key-equals are served by the ``jsonb_path_ops`` GIN
+    indexes; that operator class does not support ``?``, so key-exists filters
+    are evaluated on the rows selected by the other conditions.
+    """
+    conditions: list[ColumnElement[bool]] = []
+    for expression in expressions or []:
+        try:
+            if expression.startswith("{"):
+                document = json.loads(expression)
+                if not isinstance(document, dict):
+                    raise ValueError(expression)
+                conditions.append(column.contains(document))
+            elif ":" in expression:
+                key, raw = expression.split(":", 1)
+                try:
+                    value = json.loads(raw)
+                except ValueError:
+                    value = raw
+                conditions.append(column.contains(_nest(key.split("."), value)))
+            else:
+                *parents, key = expression.split(".")
+                target = column
+                for parent in parents:
+                    target = target[parent]
+                conditions.append(target.has_key(key))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid filter: {expression}")
+    return conditions
@@ -1,6 +1,16 @@
 from fastapi import APIRouter
 
-from app.api.routes import items, login, private, users, utils
+from app.api.routes import (
+    api_keys,
+    events,
+    items,
+    login,
+    metrics,
+    private,
+    search,
+    users,
+    utils,
+)
 from app.core.config import settings
 
 api_router = APIRouter()
@@ -8,6 +18,10 @@ api_router.include_router(login.router)
 api_router.include_router(users.router)
 api_router.include_router(utils.router)
 api_router.include_router(items.router)
+api_router.include_router(search.router)
+api_router.include_router(events.router)
+api_router.include_router(metrics.router)
+api_router.include_router(api_keys.router)
 
 
 if settings.ENVIRONMENT == "local":
@@ -0,0 +1,85 @@
+import base64
+import binascii
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlmodel import col
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+
+def _encode(values: list[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list[Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(values, list):
+        raise ValueError(cursor)
+    return values
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    """Build an opaque cursor pointing just after the row (created_at, id)."""
+    return _encode([created_at.isoformat(), id.hex])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        created_at, id = _decode(cursor)
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_rank_cursor(rank: float, id: uuid.UUID) -> str:
+    """Cursor for relevance-ordered results: just after the row (rank, id)."""
+    return _encode([rank, id.hex])
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, uuid.UUID]:
+    try:
+        rank, id = _decode(cursor)
+        return float(rank), uuid.UUID(id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate[S: (Select[Any], SelectOfScalar[Any])](
+    statement: S,
+    model: Any,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> S:
+    """
+    Order ``statement`` by ``(created_at, id)`` and apply a page window.
+
+    With a cursor the window starts right after the cursor row (keyset
+    pagination, constant cost per page); without one ``skip`` is used as a
+    plain OFFSET for backwards compatibility. One extra row is fetched so
+    ``split_page`` can tell whether a next page exists.
+    """
+    created_at, id = col(model.created_at), col(model.id)
+    statement = statement.order_by(created_at, id)
+    if cursor is not None:
+        statement = statement.where(tuple_(created_at, id) > decode_cursor(cursor))
+    elif skip:
+        statement = statement.offset(skip)
+    return statement.limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> tuple[list[Any], str | None]:
+    """Trim the look-ahead row returned by ``paginate`` and build ``next_cursor``."""
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,80 @@
+import uuid
+from typing import Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Security
+from sqlmodel import col, func, select
+
+from app.api.deps import AsyncSessionDep, get_current_user
+from app.core.api_keys import (
+    API_KEY_SCOPES,
+    generate_api_key,
+    hash_api_key,
+    invalidate_api_key,
+)
+from app.models import (
+    APIKey,
+    APIKeyCreated,
+    APIKeyCreateMe,
+    APIKeysPublic,
+    Message,
+    User,
+)
+
+router = APIRouter(prefix="/api-keys", tags=["api-keys"])
+
+# "api-keys" is not grantable, so keys cannot be managed with an API key
+KeyOwner = Annotated[User, Security(get_current_user, scopes=["api-keys"])]
+
+
+@router.get("/", response_model=APIKeysPublic)
+async def read_api_keys(session: AsyncSessionDep, current_user: KeyOwner) -> Any:
+    """
+    Retrieve own API keys.
+    """
+    owned = col(APIKey.user_id) == current_user.id
+    count = (await session.exec(select(func.count()).where(owned))).one()
+    statement = select(APIKey).where(owned).order_by(col(APIKey.created_at))
+    api_keys = (await session.exec(statement)).all()
+    return APIKeysPublic(data=api_keys, count=count)
+
+
+@router.post("/", response_model=APIKeyCreated)
+async def create_api_key(
+    *, session: AsyncSessionDep, current_user: KeyOwner, api_key_in: APIKeyCreateMe
+) -> Any:
+    """
+    Create an API key. The key itself is only returned in this response.
+    """
+    unknown = [scope for scope in api_key_in.scopes if scope not in API_KEY_SCOPES]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown scopes: {', '.join(unknown)}"
+        )
+    key = generate_api_key()
+    key_hash = hash_api_key(key)
+    api_key = APIKey.model_validate(
+        api_key_in, update={"user_id": current_user.id, "key_hash": key_hash}
+    )
+    session.add(api_key)
+    await session.commit()
+    await session.refresh(api_key)
+    invalidate_api_key(key_hash)
+    return APIKeyCreated.model_validate(api_key, update={"key": key})
+
+
+@router.delete("/{id}")
+async def delete_api_key(
+    session: AsyncSessionDep, current_user: KeyOwner, id: uuid.UUID
+) -> Message:
+    """
+    Revoke an API key.
+    """
+    api_key = await session.get(APIKey, id)
+    if not api_key:
+        raise HTTPException(status_code=404, detail="API key not found")
+    if not current_user.is_superuser and (api_key.user_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    await session.delete(api_key)
+    await session.commit()
+    invalidate_api_key(api_key.key_hash)
+    return Message(message="API key revoked successfully")
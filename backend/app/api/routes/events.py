@@ -0,0 +1,164 @@
+import math
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Query
+from sqlmodel import col, select
+
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentPrincipal,
+    CurrentUser,
+    ReadSessionDep,
+)
+from app.api.filters import jsonb_filters
+from app.api.pagination import paginate, split_page
+from app.core.config import settings
+from app.core.event_sink import event_sink
+from app.core.rollups import bucket_after, event_counts
+from app.models import (
+    Event,
+    EventCount,
+    EventCountsPublic,
+    EventCreate,
+    EventGranularity,
+    EventsAccepted,
+    EventsPublic,
+    Item,
+)
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+def _as_stored(value: datetime) -> datetime:
+    # created_at holds naive UTC; comparing it to an aware value would cast
+    # the column and keep Postgres from pruning partitions at plan time
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+@router.get("/", response_model=EventsPublic)
+async def read_events(
+    session: ReadSessionDep,
+    current_user: CurrentUser,
+    limit: int = 100,
+    cursor: str | None = None,
+    event_type: str | None = None,
+    item_id: uuid.UUID | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    payload: Annotated[list[str] | None, Query()] = None,
+) -> Any:
+    """
+    Retrieve events, oldest first. Non-superusers only see their own events.
+
+    `since` (inclusive) and `until` (exclusive) bound `created_at`; events are
+    stored in monthly partitions, and only those in range are scanned.
+    `payload` filters on the event payload, see `GET /items/` for the syntax.
+    """
+    filters = jsonb_filters(col(Event.payload), payload)
+    if not current_user.is_superuser:
+        filters.append(col(Event.actor_id) == current_user.id)
+    if event_type is not None:
+        filters.append(col(Event.event_type) == event_type)
+    if item_id is not None:
+        filters.append(col(Event.item_id) == item_id)
+    if since is not None:
+        filters.append(col(Event.created_at) >= _as_stored(since))
+    if until is not None:
+        filters.append(col(Event.created_at) < _as_stored(until))
+
+    statement = paginate(
+        select(Event).where(*filters), Event, limit=limit, cursor=cursor
+    )
+    events, next_cursor = split_page((await session.exec(statement)).all(), limit)
+    return EventsPublic(data=events, next_cursor=next_cursor)
+
+
+@router.get("/analytics", response_model=EventCountsPublic)
+async def read_event_counts(
+    session: ReadSessionDep,
+    principal: CurrentPrincipal,
+    since: datetime,
+    until: datetime | None = None,
+    granularity: EventGranularity = EventGranularity.hour,
+    event_type: str | None = None,
+    organization_id: uuid.UUID | None = None,
+    model_id: uuid.UUID | None = None,
+) -> Any:
+    """
+    Count events per bucket, event type, organization and model.
+
+    Returns the buckets starting in [`since`, `until`), whole buckets only;
+    `until` defaults to now. Counts come from the rollups, plus the events not
+    rolled up yet. Non-superusers must pass an organization they belong to.
+    """
+    if not principal.user.is_superuser and principal.role_in(organization_id) is None:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    start = bucket_after(_as_stored(since), granularity)
+    end = bucket_after(_as_stored(until or datetime.now(UTC)), granularity)
+
+    statement = event_counts(
+        granularity,
+        start=start,
+        end=end,
+        event_type=event_type,
+        organization_id=organization_id,
+        model_id=model_id,
+    )
+    rows = await session.execute(statement)
+    return EventCountsPublic(data=[EventCount(**row._mapping) for row in rows])
+
+
+@router.post("/batch", status_code=202, response_model=EventsAccepted)
+async def create_events_batch(
+    *,
+    session: AsyncSessionDep,
+    principal: CurrentPrincipal,
+    events_in: list[EventCreate],
+) -> Any:
+    """
+    Queue events for writing; they are stored in bulk shortly after.
+
+    Non-superusers can only record events as themselves, in organizations they
+    belong to, and about items they can read. Answers 503 when the write
+    buffer cannot take the whole batch.
+    """
+    if len(events_in) > settings.EVENTS_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.EVENTS_BATCH_MAX_SIZE} events per request",
+        )
+    user = principal.user
+    if not user.is_superuser:
+        for event_in in events_in:
+            if event_in.actor_id not in (None, user.id) or (
+                event_in.organization_id is not None
+                and principal.role_in(event_in.organization_id) is None
+            ):
+                raise HTTPException(status_code=400, detail="Not enough permissions")
+            event_in.actor_id = user.id
+    item_ids = {event_in.item_id for event_in in events_in if event_in.item_id}
+    if item_ids:
+        statement = select(
+            col(Item.id), col(Item.owner_id), col(Item.organization_id)
+        ).where(col(Item.id).in_(item_ids))
+        items = {row[0]: row for row in await session.exec(statement)}
+        for item_id in item_ids:
+            if item_id not in items:
+                raise HTTPException(
+                    status_code=400, detail=f"Item not found: {item_id}"
+                )
+            _, owner_id, organization_id = items[item_id]
+            if not principal.can_read_item(owner_id, organization_id):
+                raise HTTPException(status_code=400, detail="Not enough permissions")
+    if not event_sink.emit_many(events_in):
+        retry_after = math.ceil(settings.EVENT_FLUSH_INTERVAL_SECONDS)
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pending events, retry shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+    return EventsAccepted(accepted=len(events_in))
@@ -1,62 +1,415 @@
+import csv
+import io
 import uuid
-from typing import Any
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic_core import to_json
+from sqlalchemy import ColumnElement, column, insert, inspect, values
+from sqlmodel import col, delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app import crud
+from app.api.counting import count_rows
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    ItemsReadPrincipal,
+    ItemsReadSessionDep,
+    ItemsWriteUser,
+    ReadSessionDep,
+)
+from app.api.etag import etag_matches, make_etag, not_modified, page_etag
+from app.api.fields import dump_partial, parse_fields, project
+from app.api.filters import jsonb_filters
+from app.api.pagination import paginate, split_page
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models import (
+    CountMode,
+    Item,
+    ItemBulkError,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkDeleted,
+    ItemsBulkResult,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 
 
 @router.get("/", response_model=ItemsPublic)
-def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+async def read_items(
+    session: ReadSessionDep,
+    principal: ItemsReadPrincipal,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = CountMode.exact,
+    fields: str | None = None,
+    meta: Annotated[list[str] | None, Query()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> Any:
     """
     Retrieve items.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page;
+    `skip` is kept for backwards compatibility but gets slower on deep pages.
+    `count_mode` trades accuracy of `count` for speed on large tables.
+    `fields` (e.g. `id,title`) selects only those columns and returns items
+    restricted to them. Send the returned `ETag` as `If-None-Match` to get a
+    304 when the page has not changed.
+    `meta` filters on `meta_data` and may be repeated: `{"a": 1}` (contains),
+    `a.b:value` (key equals) or `a.b` (key exists).
+    """
+    projection = parse_fields(fields, ItemPublic)
+
+    user = principal.user
+    owner_id = None if user.is_superuser else user.id
+    filters = principal.visible_items()
+    filters += jsonb_filters(col(Item.meta_data), meta)
+    statement = select(Item).where(*filters)
+    count, count_mode = await count_rows(
+        session,
+        statement,
+        count_mode,
+        # The counters only know totals per owner, not per filter or organization
+        cached=None
+        if meta or (principal.roles and not user.is_superuser)
+        else lambda: crud.get_cached_item_count_async(
+            session=session, owner_id=owner_id
+        ),
+    )
+    if if_none_match:
+        # Check freshness on the row versions alone before loading full rows
+        versions = select(Item.id, Item.created_at, Item.updated_at).where(*filters)
+        versions = paginate(versions, Item, skip=skip, limit=limit, cursor=cursor)
+        etag = page_etag(
+            (await session.exec(versions)).all()[:limit], count, count_mode, projection
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    if projection is not None:
+        columns = project(Item, projection, "created_at", "id", "updated_at")
+        rows = (
+            await session.exec(
+                paginate(
+                    select(*columns).where(*filters),
+                    Item,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                )
+            )
+        ).all()
+        page, next_cursor = split_page(rows, limit)
+        content = {
+            "data": dump_partial(ItemPublic, projection, page),
+            "count": count,
+            "count_mode": count_mode,
+            "next_cursor": next_cursor,
+        }
+        return JSONResponse(
+            content=jsonable_encoder(content),
+            headers={"ETag": page_etag(page, count, count_mode, projection)},
+        )
+    statement = paginate(statement, Item, skip=skip, limit=limit, cursor=cursor)
+    items, next_cursor = split_page((await session.exec(statement)).all(), limit)
+
+    response.headers["ETag"] = page_etag(items, count, count_mode, projection)
+    return ItemsPublic(
+        data=items, count=count, count_mode=count_mode, next_cursor=next_cursor
+    )
+
+
+def _check_bulk_size(entries: Sequence[Any]) -> None:
+    if len(entries) > settings.ITEMS_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.ITEMS_BULK_MAX_SIZE} items per request",
+        )
+
+
+async def _authorize_bulk(
+    session: AsyncSessionDep, current_user: CurrentUser, ids: list[uuid.UUID]
+) -> tuple[dict[uuid.UUID, int], list[ItemBulkError]]:
     """
+    Apply the single-item permission rules to every id with one SELECT.
+
+    Returns the writable ids mapped to their request index, plus an error entry
+    for every id that is missing, not owned by the user or repeated.
+    """
+    statement = select(Item.id, Item.owner_id).where(col(Item.id).in_(ids))
+    owners = dict((await session.exec(statement)).all())
+    allowed: dict[uuid.UUID, int] = {}
+    errors: list[ItemBulkError] = []
+    for index, id in enumerate(ids):
+        if id in allowed:
+            errors.append(
+                ItemBulkError(
+                    index=index, id=id, status_code=400, detail="Duplicate item id"
+                )
+            )
+        elif id not in owners:
+            errors.append(
+                ItemBulkError(
+                    index=index, id=id, status_code=404, detail="Item not found"
+                )
+            )
+        elif not current_user.is_superuser and owners[id] != current_user.id:
+            errors.append(
+                ItemBulkError(
+                    index=index,
+                    id=id,
+                    status_code=400,
+                    detail="Not enough permissions",
+                )
+            )
+        else:
+            allowed[id] = index
+    return allowed, errors
+
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = select(Item).offset(skip).limit(limit)
-        items = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
+@router.post("/bulk", response_model=ItemsBulkResult)
+async def create_items_bulk(
+    *,
+    session: AsyncSessionDep,
+    current_user: ItemsWriteUser,
+    items_in: list[ItemCreate],
+) -> Any:
+    """
+    Create many items with a single multi-row INSERT ... RETURNING.
+    """
+    _check_bulk_size(items_in)
+    rows = []
+    for item_in in items_in:
+        if not item_in.type:
+            item_in.type = "generic"
+        item = Item.model_validate(item_in, update={"owner_id": current_user.id})
+        rows.append(item.model_dump())
+    data: list[ItemPublic] = []
+    if rows:
+        statement = insert(Item).returning(Item, sort_by_parameter_order=True)
+        items = (await session.exec(statement, params=rows)).scalars()
+        data = [ItemPublic.model_validate(item) for item in items]
+        await session.commit()
+    return ItemsBulkResult(data=data, errors=[])
+
+
+@router.patch("/bulk", response_model=ItemsBulkResult)
+async def update_items_bulk(
+    *,
+    session: AsyncSessionDep,
+    current_user: ItemsWriteUser,
+    items_in: list[ItemBulkUpdate],
+) -> Any:
+    """
+    Update many items in one transaction.
+
+    Entries that set the same fields are applied together with a single
+    UPDATE ... FROM (VALUES ...) RETURNING statement.
+    """
+    _check_bulk_size(items_in)
+    allowed, errors = await _authorize_bulk(
+        session, current_user, [item_in.id for item_in in items_in]
+    )
+    columns = inspect(Item).columns
+    now = datetime.utcnow()
+    groups: dict[tuple[str, ...], list[tuple[Any, ...]]] = {}
+    for index, item_in in enumerate(items_in):
+        if allowed.get(item_in.id) != index:
+            continue
+        update_dict = item_in.model_dump(exclude_unset=True, exclude={"id"})
+        # A NOT NULL violation would fail the whole statement
+        null = [
+            k for k, v in update_dict.items() if v is None and not columns[k].nullable
+        ]
+        if null:
+            errors.append(
+                ItemBulkError(
+                    index=index,
+                    id=item_in.id,
+                    status_code=400,
+                    detail=f"Fields cannot be null: {', '.join(null)}",
+                )
+            )
+            continue
+        update_dict["updated_at"] = now
+        fields = tuple(sorted(update_dict))
+        row = (item_in.id, *(update_dict[field] for field in fields))
+        groups.setdefault(fields, []).append(row)
+
+    updated: dict[uuid.UUID, ItemPublic] = {}
+    for fields, rows in groups.items():
+        source = values(
+            *(column(name, columns[name].type) for name in ("id", *fields)),
+            name="source",
+        ).data(rows)
+        statement = (
+            update(Item)
+            .where(col(Item.id) == source.c.id)
+            .values({field: source.c[field] for field in fields})
+            .returning(Item)
         )
-        count = session.exec(count_statement).one()
+        if not current_user.is_superuser:
+            statement = statement.where(col(Item.owner_id) == current_user.id)
+        result = await session.exec(
+            statement, execution_options={"synchronize_session": False}
+        )
+        for item in result.scalars():
+            updated[item.id] = ItemPublic.model_validate(item)
+    await session.commit()
+    data = [updated[id] for id in allowed if id in updated]
+    errors.sort(key=lambda error: error.index)
+    return ItemsBulkResult(data=data, errors=errors)
+
+
+@router.delete("/bulk", response_model=ItemsBulkDeleted)
+async def delete_items_bulk(
+    session: AsyncSessionDep, current_user: ItemsWriteUser, ids: list[uuid.UUID]
+) -> Any:
+    """
+    Delete many items with a single DELETE ... RETURNING.
+    """
+    _check_bulk_size(ids)
+    allowed, errors = await _authorize_bulk(session, current_user, ids)
+    deleted: set[uuid.UUID] = set()
+    if allowed:
         statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
+            delete(Item).where(col(Item.id).in_(allowed)).returning(col(Item.id))
         )
-        items = session.exec(statement).all()
+        deleted = set((await session.exec(statement)).scalars())
+        await session.commit()
+    return ItemsBulkDeleted(ids=[id for id in allowed if id in deleted], errors=errors)
+
 
-    return ItemsPublic(data=items, count=count)
+async def _export_rows(
+    filters: list[ColumnElement[bool]], format: Literal["ndjson", "csv"]
+) -> AsyncIterator[str]:
+    """
+    Stream items from a server-side cursor, one chunk per fetched batch.
+
+    Runs on its own session because the response body outlives the request
+    handler; only ``ITEMS_EXPORT_BATCH_SIZE`` rows are held in memory at once.
+    """
+    fields = list(ItemPublic.model_fields)
+    statement = select(*(col(getattr(Item, field)) for field in fields))
+    statement = statement.where(*filters)
+    statement = statement.order_by(col(Item.created_at), col(Item.id))
+    statement = statement.execution_options(yield_per=settings.ITEMS_EXPORT_BATCH_SIZE)
+    if format == "csv":
+        yield ",".join(fields) + "\r\n"
+    async with AsyncSession(async_engine) as session:
+        result = await session.stream(statement)
+        async for rows in result.partitions():
+            if format == "ndjson":
+                yield "".join(to_json(row._asdict()).decode() + "\n" for row in rows)
+            else:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    writer.writerow(
+                        to_json(value).decode() if isinstance(value, dict) else value
+                        for value in row
+                    )
+                yield buffer.getvalue()
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_items(
+    session: ItemsReadSessionDep,
+    principal: ItemsReadPrincipal,
+    format: Literal["ndjson", "csv"] = "ndjson",
+) -> StreamingResponse:
+    """
+    Export all visible items as NDJSON or CSV, streamed as rows are read.
+    """
+    # Dependencies are cleaned up only after the body is sent: return the
+    # connection that authenticated the request instead of idling in it
+    await session.close()
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        _export_rows(principal.visible_items(), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
+    )
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+async def read_item(
+    session: ReadSessionDep,
+    principal: ItemsReadPrincipal,
+    response: Response,
+    id: uuid.UUID,
+    fields: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Any:
     """
     Get item by ID.
+
+    `fields` (e.g. `id,title`) selects only those columns. Send the returned
+    `ETag` as `If-None-Match` to get a 304 when the item has not changed.
     """
-    item = session.get(Item, id)
+    projection = parse_fields(fields, ItemPublic)
+    if if_none_match:
+        # Permission and freshness checks need only a few narrow columns
+        version = (
+            await session.exec(
+                select(
+                    Item.owner_id,
+                    Item.organization_id,
+                    Item.created_at,
+                    Item.updated_at,
+                ).where(Item.id == id)
+            )
+        ).first()
+        if not version:
+            raise HTTPException(status_code=404, detail="Item not found")
+        owner_id, organization_id, created_at, updated_at = version
+        if not principal.can_read_item(owner_id, organization_id):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        etag = make_etag(id, created_at, updated_at, projection)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    if projection is not None:
+        columns = project(
+            Item,
+            projection,
+            "owner_id",
+            "organization_id",
+            "created_at",
+            "updated_at",
+        )
+        row = (await session.exec(select(*columns).where(col(Item.id) == id))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Item not found")
+        if not principal.can_read_item(row.owner_id, row.organization_id):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        return JSONResponse(
+            content=dump_partial(ItemPublic, projection, [row])[0],
+            headers={"ETag": make_etag(id, row.created_at, row.updated_at, projection)},
+        )
+    item = await session.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item.owner_id != current_user.id):
+    if not principal.can_read_item(item.owner_id, item.organization_id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
+    response.headers["ETag"] = make_etag(id, item.created_at, item.updated_at, None)
     return item
 
 
 @router.post("/", response_model=ItemPublic)
-def create_item(
-    *, session: SessionDep, current_user: CurrentUser, item_in: ItemCreate
+async def create_item(
+    *, session: AsyncSessionDep, current_user: ItemsWriteUser, item_in: ItemCreate
 ) -> Any:
     """Create new item.
 
@@ -68,48 +421,46 @@ def create_item(
     if not item_in.type:
         item_in.type = "generic"  # mutate allowed, SQLModel/Pydantic object
     item = Item.model_validate(item_in, update={"owner_id": current_user.id})
-    session.add(item)
-    session.commit()
-    session.refresh(item)
-    return item
+    return await crud.insert_returning_async(session=session, obj=item)
 
 
 @router.put("/{id}", response_model=ItemPublic)
-def update_item(
+async def update_item(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    session: AsyncSessionDep,
+    current_user: ItemsWriteUser,
     id: uuid.UUID,
     item_in: ItemUpdate,
 ) -> Any:
     """
     Update an item.
     """
-    item = session.get(Item, id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
     update_dict = item_in.model_dump(exclude_unset=True)
-    item.sqlmodel_update(update_dict)
-    session.add(item)
-    session.commit()
-    session.refresh(item)
-    return item
+    update_dict["updated_at"] = datetime.utcnow()
+    owned = [] if current_user.is_superuser else [col(Item.owner_id) == current_user.id]
+    item = await crud.update_returning_async(
+        session=session, model=Item, id=id, values=update_dict, where=owned
+    )
+    if item:
+        return item
+    # Nothing matched: tell a missing item from someone else's
+    if not (await session.exec(select(Item.id).where(Item.id == id))).first():
+        raise HTTPException(status_code=404, detail="Item not found")
+    raise HTTPException(status_code=400, detail="Not enough permissions")
 
 
 @router.delete("/{id}")
-def delete_item(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def delete_item(
+    session: AsyncSessionDep, current_user: ItemsWriteUser, id: uuid.UUID
 ) -> Message:
     """
     Delete an item.
     """
-    item = session.get(Item, id)
+    item = await session.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    session.delete(item)
-    session.commit()
+    await session.delete(item)
+    await session.commit()
     return Message(message="Item deleted successfully")
@@ -1,15 +1,18 @@
 from datetime import timedelta
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import AsyncSessionDep, CurrentUser, get_current_active_superuser
 from app.core import security
+from app.core.cache import invalidate_user
 from app.core.config import settings
-from app.core.security import get_password_hash
+from app.core.rate_limit import RateLimit
+from app.core.security import get_password_hash_async
 from app.models import Message, NewPassword, Token, UserPublic
 from app.utils import (
     generate_password_reset_token,
@@ -20,15 +23,35 @@ from app.utils import (
 
 router = APIRouter(tags=["login"])
 
+login_ip_limit = RateLimit("login-ip", settings.LOGIN_RATE_LIMIT_PER_IP)
+login_username_limit = RateLimit(
+    "login-username", settings.LOGIN_RATE_LIMIT_PER_USERNAME
+)
+recovery_ip_limit = RateLimit(
+    "recovery-ip", settings.PASSWORD_RECOVERY_RATE_LIMIT_PER_IP
+)
+recovery_email_limit = RateLimit(
+    "recovery-email", settings.PASSWORD_RECOVERY_RATE_LIMIT_PER_EMAIL
+)
+
+
+def client_ip(request: Request) -> str:
+    # Run uvicorn with --proxy-headers behind a proxy so this is the real client
+    return request.client.host if request.client else "unknown"
+
 
 @router.post("/login/access-token")
-def login_access_token(
-    session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+async def login_access_token(
+    request: Request,
+    session: AsyncSessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.authenticate(
+    await login_ip_limit.hit(client_ip(request))
+    await login_username_limit.hit(form_data.username.lower())
+    user = await crud.authenticate_async(
         session=session, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -44,7 +67,7 @@ def login_access_token(
 
 
 @router.post("/login/test-token", response_model=UserPublic)
-def test_token(current_user: CurrentUser) -> Any:
+async def test_token(current_user: CurrentUser) -> Any:
     """
     Test access token
     """
@@ -52,11 +75,15 @@ def test_token(current_user: CurrentUser) -> Any:
 
 
 @router.post("/password-recovery/{email}")
-def recover_password(email: str, session: SessionDep) -> Message:
+async def recover_password(
+    request: Request, email: str, session: AsyncSessionDep
+) -> Message:
     """
     Password Recovery
     """
-    user = crud.get_user_by_email(session=session, email=email)
+    await recovery_ip_limit.hit(client_ip(request))
+    await recovery_email_limit.hit(email.lower())
+    user = await crud.get_user_by_email_async(session=session, email=email)
 
     if not user:
         raise HTTPException(
@@ -67,7 +94,8 @@ def recover_password(email: str, session: SessionDep) -> Message:
     email_data = generate_reset_password_email(
         email_to=user.email, email=email, token=password_reset_token
     )
-    send_email(
+    await run_in_threadpool(
+        send_email,
         email_to=user.email,
         subject=email_data.subject,
         html_content=email_data.html_content,
@@ -76,14 +104,14 @@ def recover_password(email: str, session: SessionDep) -> Message:
 
 
 @router.post("/reset-password/")
-def reset_password(session: SessionDep, body: NewPassword) -> Message:
+async def reset_password(session: AsyncSessionDep, body: NewPassword) -> Message:
     """
     Reset password
     """
     email = verify_password_reset_token(token=body.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid token")
-    user = crud.get_user_by_email(session=session, email=email)
+    user = await crud.get_user_by_email_async(session=session, email=email)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -91,10 +119,11 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
         )
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    hashed_password = get_password_hash(password=body.new_password)
+    hashed_password = await get_password_hash_async(password=body.new_password)
     user.hashed_password = hashed_password
     session.add(user)
-    session.commit()
+    await session.commit()
+    invalidate_user(user.id)
     return Message(message="Password updated successfully")
 
 
@@ -103,11 +132,11 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
     dependencies=[Depends(get_current_active_superuser)],
     response_class=HTMLResponse,
 )
-def recover_password_html_content(email: str, session: SessionDep) -> Any:
+async def recover_password_html_content(email: str, session: AsyncSessionDep) -> Any:
     """
     HTML Content for Password Recovery
     """
-    user = crud.get_user_by_email(session=session, email=email)
+    user = await crud.get_user_by_email_async(session=session, email=email)
 
     if not user:
         raise HTTPException(
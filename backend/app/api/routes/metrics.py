@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_active_superuser
+from app.core.api_keys import api_key_cache, unknown_api_key_cache
+from app.core.cache import token_cache, user_cache
+from app.core.db import (
+    async_pool_monitor,
+    replica_pool_monitor,
+    slow_query_log,
+    sync_pool_monitor,
+)
+from app.core.event_sink import event_sink
+from app.core.hashing import hashing_pool
+from app.models import (
+    CacheStats,
+    EventSinkStats,
+    HashingPoolStats,
+    PoolStats,
+    SlowQueryStats,
+)
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(get_current_active_superuser)],
+)
+
+
+@router.get("/hashing", response_model=HashingPoolStats)
+async def read_hashing_metrics() -> HashingPoolStats:
+    """
+    Password hashing pool occupancy, rejections and latency.
+    """
+    return hashing_pool.stats()
+
+
+@router.get("/caches", response_model=list[CacheStats])
+async def read_cache_metrics() -> list[CacheStats]:
+    """
+    Size and hit/miss counters of the in-process caches.
+    """
+    return [
+        token_cache.stats("tokens"),
+        user_cache.stats("users"),
+        api_key_cache.stats("api_keys"),
+        unknown_api_key_cache.stats("unknown_api_keys"),
+    ]
+
+
+@router.get("/pools", response_model=list[PoolStats])
+async def read_pool_metrics() -> list[PoolStats]:
+    """
+    Database connection pool usage, checkout waits and timeouts per engine.
+    """
+    monitors = [sync_pool_monitor, async_pool_monitor, replica_pool_monitor]
+    return [monitor.stats() for monitor in monitors if monitor is not None]
+
+
+@router.get("/slow-queries", response_model=list[SlowQueryStats])
+async def read_slow_queries(limit: int = 20) -> list[SlowQueryStats]:
+    """
+    Statements over the slow query threshold, grouped by fingerprint, with the
+    highest total time first. Includes a sampled plan for each.
+    """
+    return slow_query_log.top(limit)
+
+
+@router.get("/events", response_model=EventSinkStats)
+async def read_event_sink_metrics() -> EventSinkStats:
+    """
+    Buffered, written and dropped events of the event sink.
+    """
+    return event_sink.stats()
@@ -0,0 +1,89 @@
+from typing import Any
+
+from fastapi import APIRouter, Query
+from sqlalchemy import and_, cast, func, or_, union_all
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlmodel import col, select
+from sqlmodel.sql.expression import Select
+
+from app.api.deps import ItemsReadPrincipal, ReadSessionDep
+from app.api.pagination import decode_rank_cursor, encode_rank_cursor
+from app.models import (
+    Content,
+    Item,
+    ItemSearchHit,
+    ItemSearchResults,
+    content_search_vector,
+    item_search_vector,
+)
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+# Must match the configuration used by the generated search_vector columns
+SEARCH_CONFIG = "english"
+
+
+@router.get("/items", response_model=ItemSearchResults)
+async def search_items(
+    session: ReadSessionDep,
+    principal: ItemsReadPrincipal,
+    q: str = Query(min_length=1, max_length=500),
+    limit: int = 20,
+    cursor: str | None = None,
+) -> Any:
+    """
+    Full-text search over item titles, descriptions and content texts.
+
+    `q` accepts web search syntax (quoted phrases, `or`, `-word`). Results are
+    ordered by relevance; pass `next_cursor` back as `cursor` for the next page.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    visible = principal.visible_items()
+
+    item_hits: Select[Any] = select(
+        col(Item.id).label("item_id"),
+        func.ts_rank(item_search_vector, query).label("rank"),
+    ).where(item_search_vector.op("@@")(query), *visible)
+    # Best matching content per item, so long threads do not drown out titles
+    content_hits: Select[Any] = (
+        select(
+            col(Content.item_id).label("item_id"),
+            func.max(func.ts_rank(content_search_vector, query)).label("rank"),
+        )
+        .join(Item, col(Item.id) == col(Content.item_id))
+        .where(content_search_vector.op("@@")(query), *visible)
+        .group_by(col(Content.item_id))
+    )
+    hits = union_all(item_hits, content_hits).subquery()
+    ranked = (
+        # ts_rank returns real; double precision survives the cursor round trip
+        select(
+            hits.c.item_id,
+            cast(func.sum(hits.c.rank), DOUBLE_PRECISION).label("rank"),
+        )
+        .group_by(hits.c.item_id)
+        .subquery()
+    )
+
+    statement = select(Item, ranked.c.rank).join(
+        ranked, col(Item.id) == ranked.c.item_id
+    )
+    if cursor is not None:
+        after_rank, after_id = decode_rank_cursor(cursor)
+        statement = statement.where(
+            or_(
+                ranked.c.rank < after_rank,
+                and_(ranked.c.rank == after_rank, col(Item.id) > after_id),
+            )
+        )
+    statement = statement.order_by(ranked.c.rank.desc(), col(Item.id)).limit(limit + 1)
+    rows = (await session.exec(statement)).all()
+
+    data = [
+        ItemSearchHit.model_validate(item, update={"rank": rank})
+        for item, rank in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit and data:
+        next_cursor = encode_rank_cursor(data[-1].rank, data[-1].id)
+    return ItemSearchResults(data=data, next_cursor=next_cursor)
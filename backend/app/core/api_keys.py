@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import logging
+import secrets
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import DateTime, Uuid, column, values
+from sqlmodel import col, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models import APIKey
+
+logger = logging.getLogger(__name__)
+
+API_KEY_PREFIX = "sk_"
+# Scopes that can be granted to a key. Routes without a scope reject keys, and
+# a scope missing here (e.g. "api-keys") can only be satisfied by a login token.
+API_KEY_SCOPES = {
+    "items:read": "List, read, search and export items",
+    "items:write": "Create, update and delete items",
+}
+
+
+def generate_api_key() -> str:
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+def hash_api_key(key: str) -> str:
+    # Keys are 256 random bits, so a fast digest is enough and keeps lookups cheap
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedAPIKey:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    scopes: frozenset[str]
+    expires_at: datetime | None
+
+    @classmethod
+    def from_row(cls, api_key: APIKey) -> "CachedAPIKey":
+        return cls(
+            id=api_key.id,
+            user_id=api_key.user_id,
+            scopes=frozenset(api_key.scopes),
+            expires_at=api_key.expires_at,
+        )
+
+
+# Resolved keys by hash, and hashes known not to exist so that repeated bad
+# keys do not reach the database either
+api_key_cache: TTLCache[str, CachedAPIKey] = TTLCache(
+    maxsize=settings.API_KEY_CACHE_SIZE, ttl=settings.API_KEY_CACHE_TTL_SECONDS
+)
+unknown_api_key_cache: TTLCache[str, bool] = TTLCache(
+    maxsize=settings.API_KEY_CACHE_SIZE,
+    ttl=settings.API_KEY_NEGATIVE_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_api_key(key_hash: str) -> None:
+    api_key_cache.pop(key_hash)
+    unknown_api_key_cache.pop(key_hash)
+
+
+class APIKeyUsage:
+    """
+    Write-behind buffer for ``APIKey.last_used_at``.
+
+    Requests only record the time in memory; ``flush`` writes the latest
+    timestamp of every used key with a single UPDATE.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[uuid.UUID, datetime] = {}
+        self._lock = threading.Lock()
+
+    def record(self, api_key_id: uuid.UUID) -> None:
+        with self._lock:
+            self._pending[api_key_id] = datetime.utcnow()
+
+    async def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        source = values(
+            column("id", Uuid()),
+            column("used_at", DateTime()),
+            name="source",
+        ).data(list(pending.items()))
+        statement = (
+            update(APIKey)
+            .where(col(APIKey.id) == source.c.id)
+            .values(last_used_at=source.c.used_at)
+        )
+        try:
+            async with AsyncSession(async_engine) as session:
+                await session.exec(
+                    statement, execution_options={"synchronize_session": False}
+                )
+                await session.commit()
+        except BaseException:
+            # Put the timestamps back unless newer ones arrived meanwhile, also
+            # when cancelled on shutdown so that the final flush writes them
+            with self._lock:
+                for api_key_id, used_at in pending.items():
+                    self._pending.setdefault(api_key_id, used_at)
+            raise
+        return len(pending)
+
+    async def flush_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush API key usage")
+
+
+api_key_usage = APIKeyUsage()
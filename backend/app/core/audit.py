@@ -0,0 +1,174 @@
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import Update, UpdateBase, event, insert
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+from sqlalchemy.orm.attributes import instance_state
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.models import Event, FileAsset, Item, Organization, Setting, User
+
+# Columns recorded when audited rows change. Secrets and free-form text or
+# JSON columns are left out to keep payloads small.
+AUDITED_FIELDS: dict[type[SQLModel], tuple[str, ...]] = {
+    Item: ("type", "title", "owner_id", "organization_id"),
+    User: ("email", "full_name", "is_active", "is_superuser", "auth_provider"),
+    Organization: ("name", "slug", "plan_type"),
+    Setting: ("scope", "key", "user_id", "organization_id"),
+    FileAsset: ("filename", "path", "mime_type", "size_bytes", "owner_id", "item_id"),
+}
+
+# The user on whose behalf the current request writes; set on authentication
+audit_actor: ContextVar[uuid.UUID | None] = ContextVar("audit_actor", default=None)
+
+
+@dataclass
+class _Change:
+    model: type[SQLModel]
+    id: uuid.UUID
+    action: str  # created, updated or deleted
+    values: dict[str, Any] | None = None
+    organization_id: uuid.UUID | None = None
+    item_id: uuid.UUID | None = None
+
+
+def _loaded(obj: SQLModel, key: str) -> Any:
+    # Never lazy load during a flush: deleted rows are already gone
+    return instance_state(obj).dict.get(key)
+
+
+def _change(obj: SQLModel, action: str, values: dict[str, Any] | None) -> _Change:
+    model = type(obj)
+    id = _loaded(obj, "id")
+    return _Change(
+        model=model,
+        id=id,
+        action=action,
+        values=values,
+        organization_id=id
+        if model is Organization
+        else _loaded(obj, "organization_id"),
+        item_id=id if model is Item else _loaded(obj, "item_id"),
+    )
+
+
+def _insert_events(session: Session, changes: list[_Change]) -> None:
+    if not changes:
+        return
+    # Events cannot reference rows deleted in the same flush
+    deleted = {(c.model, c.id) for c in changes if c.action == "deleted"}
+    actor_id = audit_actor.get()
+    if (User, actor_id) in deleted:
+        actor_id = None
+    created_at = datetime.utcnow()
+    rows = []
+    for change in changes:
+        payload: dict[str, Any] = {"id": change.id}
+        if change.values is not None:
+            key = "values" if change.action == "created" else "changes"
+            payload[key] = change.values
+        organization_id = change.organization_id
+        if (Organization, organization_id) in deleted:
+            organization_id = None
+        item_id = change.item_id
+        if (Item, item_id) in deleted:
+            item_id = None
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "created_at": created_at,
+                "event_type": f"{change.model.__tablename__}.{change.action}",
+                "payload": to_jsonable_python(payload),
+                "actor_id": actor_id,
+                "organization_id": organization_id,
+                "item_id": item_id,
+            }
+        )
+    # On the session's connection, so events commit or roll back with the change
+    session.connection().execute(insert(Event), rows)
+
+
+def _set_columns(statement: Update) -> set[str]:
+    """Names of the columns in the SET clause of ``statement``."""
+    # Bound parameters miss values that are expressions, such as the columns
+    # of an UPDATE ... FROM (VALUES ...), and there is no public accessor for
+    # the SET clause: these private attributes were checked against
+    # SQLAlchemy 2.0.44, and test_audit_update_statement fails if they change.
+    values = statement._ordered_values or list((statement._values or {}).items())
+    return {key if isinstance(key, str) else key.key for key, _ in values}
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, _flush_context: UOWTransaction) -> None:
+    """Record audited rows added, changed or deleted through the unit of work."""
+    if not settings.AUDIT_ENABLED:
+        return
+    changes: list[_Change] = []
+    for obj in session.new:
+        if (fields := AUDITED_FIELDS.get(type(obj))) is not None:
+            values = {field: _loaded(obj, field) for field in fields}
+            changes.append(_change(obj, "created", values))
+    for obj in session.dirty:
+        if (fields := AUDITED_FIELDS.get(type(obj))) is not None:
+            # History still holds this flush's changes until after_flush_postexec
+            attrs = instance_state(obj).attrs
+            values = {}
+            for field in fields:
+                if added := attrs[field].history.added:
+                    values[field] = next(iter(added))
+            if values:
+                changes.append(_change(obj, "updated", values))
+    for obj in session.deleted:
+        if type(obj) in AUDITED_FIELDS:
+            changes.append(_change(obj, "deleted", None))
+    _insert_events(session, changes)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(state: ORMExecuteState) -> Any:
+    """
+    Record audited rows written by ORM INSERT, UPDATE and DELETE statements.
+
+    Only statements with RETURNING are captured, since the rows they affected
+    are otherwise unknown: all recorded fields when the whole row is returned,
+    just the id otherwise.
+    """
+    statement = state.statement
+    mapper = state.bind_mapper
+    if (
+        not settings.AUDIT_ENABLED
+        or not isinstance(statement, UpdateBase)
+        or mapper is None
+        or mapper.class_ not in AUDITED_FIELDS
+        # The RETURNING columns, empty without RETURNING
+        or not statement.exported_columns
+    ):
+        return None
+    model = mapper.class_
+    fields = AUDITED_FIELDS[model]
+
+    result = state.invoke_statement().freeze()
+    action = (
+        "created" if state.is_insert else "updated" if state.is_update else "deleted"
+    )
+    if state.is_update:
+        assert isinstance(statement, Update)
+        updated = _set_columns(statement)
+        fields = tuple(field for field in fields if field in updated)
+    changes: list[_Change] = []
+    for row in result().all():
+        if not isinstance(row[0], model):
+            id = row._mapping["id"]
+            item_id = id if model is Item else None
+            changes.append(_Change(model=model, id=id, action=action, item_id=item_id))
+        elif action == "deleted":
+            changes.append(_change(row[0], action, None))
+        elif values := {field: getattr(row[0], field) for field in fields}:
+            changes.append(_change(row[0], action, values))
+    _insert_events(state.session, changes)
+    return result()
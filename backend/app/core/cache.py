@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+from app.models import CacheStats, MembershipRole, TokenPayload
+
+
+class TTLCache[K, V]:
+    """
+    Thread-safe LRU cache whose entries also expire ``ttl`` seconds after insert.
+
+    ``generation`` changes on every invalidation. Readers that fill the cache
+    after a miss pass the generation they observed before querying, so a value
+    read concurrently with an invalidation is not stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        *,
+        generation: int | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        """Store ``value``; ``ttl`` overrides the cache-wide lifetime if shorter."""
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self, name: str) -> CacheStats:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return CacheStats(
+                name=name,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+                hits=self.hits,
+                misses=self.misses,
+                hit_ratio=self.hits / lookups if lookups else 0.0,
+            )
+
+
+# Column snapshots of active users with their role per organization, by user id
+UserSnapshot = tuple[dict[str, Any], dict[uuid.UUID, MembershipRole]]
+user_cache: TTLCache[str, UserSnapshot] = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+# Validated claims by token digest, each kept until the token's own expiry
+token_cache: TTLCache[str, TokenPayload] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+# Users who wrote recently through this worker; their reads stay on the
+# primary until the replica has caught up
+recent_writers: TTLCache[str, bool] = TTLCache(
+    maxsize=100_000, ttl=settings.REPLICA_STICKY_SECONDS
+)
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    """Drop the cached snapshot of a user whose row was changed or deleted."""
+    user_cache.pop(str(user_id))
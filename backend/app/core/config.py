@@ -67,6 +67,30 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Optional streaming replica of the same database, with the same
+    # credentials. Read-only list and detail routes query it, except for users
+    # who wrote within the last REPLICA_STICKY_SECONDS, which should exceed the
+    # usual replication lag. Writes set a cookie carrying that window, so it
+    # holds across workers for clients that keep cookies; for others it only
+    # holds on the worker that served the write.
+    POSTGRES_REPLICA_SERVER: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None
+    REPLICA_STICKY_SECONDS: float = 5
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_REPLICA_DATABASE_URI(self) -> PostgresDsn | None:
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        return PostgresDsn.build(
+            scheme="postgresql+psycopg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_REPLICA_SERVER,
+            port=self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -89,6 +113,91 @@ class Settings(BaseSettings):
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
+    # Connection pool of each engine (sync and async) in every worker process.
+    # Keep workers x 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) below the server's
+    # max_connections. Connections are replaced after DB_POOL_RECYCLE_SECONDS
+    # (-1 disables) and, with pre-ping, tested on checkout so that ones closed
+    # by the server or a proxy are not handed out.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Requests running one statement more often than this log a warning
+    REPEATED_QUERY_WARNING_THRESHOLD: int = 10
+    # Statements slower than this are logged without their parameters and
+    # aggregated by fingerprint in GET /metrics/slow-queries (unset disables).
+    # A plan is sampled per fingerprint at most every
+    # SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS; reads are explained with ANALYZE,
+    # which runs them once more, unless SLOW_QUERY_EXPLAIN_ANALYZE is off.
+    SLOW_QUERY_THRESHOLD_MS: float | None = 500
+    SLOW_QUERY_EXPLAIN_ANALYZE: bool = True
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 300
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 5000
+    # The event table is partitioned by month; `python -m app.event_partitions`
+    # keeps EVENT_PARTITIONS_AHEAD_MONTHS future partitions and drops months
+    # older than EVENT_RETENTION_MONTHS (unset keeps all events).
+    EVENT_PARTITIONS_AHEAD_MONTHS: int = 3
+    EVENT_RETENTION_MONTHS: int | None = None
+    # Events emitted by request handlers are buffered in memory and written in
+    # batches of EVENT_FLUSH_BATCH_SIZE, at least every
+    # EVENT_FLUSH_INTERVAL_SECONDS. Events beyond EVENT_BUFFER_SIZE are dropped,
+    # and POST /events/batch answers 503 instead.
+    EVENT_BUFFER_SIZE: int = 50_000
+    EVENT_FLUSH_BATCH_SIZE: int = 1000
+    EVENT_FLUSH_INTERVAL_SECONDS: float = 1
+    # Upper bound on events accepted by one POST /events/batch
+    EVENTS_BATCH_MAX_SIZE: int = 1000
+    # `python -m app.event_rollups` counts events into hourly and daily rollups
+    # up to EVENT_ROLLUP_LAG_SECONDS ago, so that buffered events written late
+    # are still counted, in transactions of at most EVENT_ROLLUP_WINDOW_HOURS.
+    EVENT_ROLLUP_LAG_SECONDS: float = 300
+    EVENT_ROLLUP_WINDOW_HOURS: int = 24
+    # Record an event in the same transaction whenever items, users,
+    # organizations, settings or files are written through the ORM (see
+    # app/core/audit.py). Off by default: each audited flush costs one INSERT.
+    AUDIT_ENABLED: bool = False
+    # Upper bound on entries accepted by the /items/bulk endpoints
+    ITEMS_BULK_MAX_SIZE: int = 1000
+    # Rows fetched per server-side cursor round trip by /items/export
+    ITEMS_EXPORT_BATCH_SIZE: int = 1000
+    # Per-process cache of authenticated users. Writes through the API
+    # invalidate it locally; other workers see changes once the TTL expires.
+    # A size of 0 disables the cache.
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 30
+    # Verified access token claims, cached until each token expires
+    TOKEN_CACHE_SIZE: int = 10_000
+    # Password hashing runs on its own pool: HASHING_POOL_SIZE hashes at once
+    # (about one per core), HASHING_QUEUE_SIZE waiting; beyond that requests
+    # get a 503 asking clients to retry after HASHING_RETRY_AFTER_SECONDS.
+    HASHING_POOL_SIZE: int = 4
+    HASHING_QUEUE_SIZE: int = 32
+    HASHING_RETRY_AFTER_SECONDS: int = 1
+    # Scheme and cost for new password hashes. Stored hashes using another
+    # scheme or cost are upgraded on the next successful login. argon2
+    # requires the argon2-cffi package; its defaults follow the OWASP
+    # baseline (19 MiB, 2 passes, 1 lane). Compare options with
+    # `python -m app.hash_benchmark`.
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST_KIB: int = 19 * 1024
+    ARGON2_PARALLELISM: int = 1
+    # API keys are resolved through an in-process cache; unknown keys are
+    # remembered for a shorter time. last_used_at is written in batches.
+    API_KEY_CACHE_SIZE: int = 10_000
+    API_KEY_CACHE_TTL_SECONDS: float = 60
+    API_KEY_NEGATIVE_CACHE_TTL_SECONDS: float = 10
+    API_KEY_USAGE_FLUSH_SECONDS: float = 30
+    # Token buckets for credential endpoints: bursts of N requests per client
+    # IP and per username/email, refilled evenly over a minute.
+    RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 5
+    PASSWORD_RECOVERY_RATE_LIMIT_PER_IP: int = 5
+    PASSWORD_RECOVERY_RATE_LIMIT_PER_EMAIL: int = 2
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
@@ -1,10 +1,83 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, create_engine, select
 
 from app import crud
+from app.core import audit  # noqa: F401 (registers the audit session hooks)
 from app.core.config import settings
+from app.core.pool import MonitoredAsyncQueuePool, MonitoredQueuePool, PoolMonitor
+from app.core.slow_queries import SlowQueryLog
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+pool_options = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=MonitoredQueuePool,
+    **pool_options,
+)
+# Same DSN: with create_async_engine, postgresql+psycopg selects psycopg's
+# async driver. API routes use this one; scripts keep the sync engine.
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=MonitoredAsyncQueuePool,
+    **pool_options,
+)
+
+replica_async_engine: AsyncEngine | None = None
+if settings.SQLALCHEMY_REPLICA_DATABASE_URI:
+    replica_async_engine = create_async_engine(
+        str(settings.SQLALCHEMY_REPLICA_DATABASE_URI),
+        poolclass=MonitoredAsyncQueuePool,
+        **pool_options,
+    )
+
+sync_pool_monitor = PoolMonitor("sync")
+sync_pool_monitor.attach(engine)
+async_pool_monitor = PoolMonitor("async")
+async_pool_monitor.attach(async_engine.sync_engine)
+replica_pool_monitor: PoolMonitor | None = None
+if replica_async_engine is not None:
+    replica_pool_monitor = PoolMonitor("replica")
+    replica_pool_monitor.attach(replica_async_engine.sync_engine)
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    explain_engine=engine,
+    explain_analyze=settings.SLOW_QUERY_EXPLAIN_ANALYZE,
+    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+    explain_timeout_ms=settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+)
+slow_query_log.attach(engine)
+slow_query_log.attach(async_engine.sync_engine)
+if replica_async_engine is not None:
+    # Plans are still captured on the primary, which has the same schema
+    slow_query_log.attach(replica_async_engine.sync_engine)
+
+
+class ReplicaSession(Session):
+    """
+    Session for read-only requests that queries the replica, if there is one.
+
+    ``info["use_primary"]`` is called on the first statement; if it returns
+    True the whole session stays on the primary instead.
+    """
+
+    def get_bind(self, *args: Any, **kwargs: Any) -> Any:
+        if replica_async_engine is None:
+            return super().get_bind(*args, **kwargs)
+        if "use_replica" not in self.info:
+            self.info["use_replica"] = not self.info["use_primary"]()
+        if not self.info["use_replica"]:
+            return super().get_bind(*args, **kwargs)
+        return replica_async_engine.sync_engine
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import threading
+import uuid
+from collections import deque
+from collections.abc import Sequence
+from contextlib import suppress
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError, InterfaceError, OperationalError
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models import Event, EventCreate, EventSinkStats
+
+logger = logging.getLogger(__name__)
+
+
+class EventSink:
+    """
+    Write-behind buffer for events.
+
+    Request handlers call ``emit``, which only appends to memory; ``run``
+    writes the buffer with multi-row INSERTs of up to ``batch_size`` rows
+    whenever that many are pending or every ``flush_interval`` seconds.
+    At most ``maxsize`` events are held: once full, new events are dropped
+    and counted rather than slowing requests down.
+    """
+
+    def __init__(self, *, maxsize: int, batch_size: int, flush_interval: float) -> None:
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: deque[dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._accepted = 0
+        self._dropped = 0
+        self._flushed = 0
+        self._failed_flushes = 0
+
+    def emit(self, event: EventCreate) -> bool:
+        """Buffer one event; returns False if the buffer is full and it was dropped."""
+        return self.emit_many([event])
+
+    def emit_many(self, events: Sequence[EventCreate]) -> bool:
+        """Buffer all of ``events``, or none of them if they do not fit."""
+        # Stamp events now, not when they are written
+        created_at = datetime.utcnow()
+        rows = [
+            {"id": uuid.uuid4(), "created_at": created_at, **event.model_dump()}
+            for event in events
+        ]
+        with self._lock:
+            if len(self._pending) + len(rows) > self.maxsize:
+                self._dropped += len(rows)
+                return False
+            self._pending.extend(rows)
+            self._accepted += len(rows)
+            full_batch = len(self._pending) >= self.batch_size
+        if full_batch:
+            self._wake()
+        return True
+
+    def _wake(self) -> None:
+        # emit() also runs in the threadpool for sync routes
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _take(self) -> list[dict[str, Any]]:
+        with self._lock:
+            count = min(len(self._pending), self.batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _requeue(self, rows: list[dict[str, Any]]) -> None:
+        with self._lock:
+            room = max(self.maxsize - len(self._pending), 0)
+            self._dropped += max(len(rows) - room, 0)
+            # Keep the oldest events in front, dropping the newest that do not fit
+            self._pending.extendleft(reversed(rows[:room]))
+
+    async def flush(self) -> int:
+        """
+        Write everything buffered so far; returns the number of events written.
+
+        A batch the database rejects is split in halves and retried, so only
+        the offending events are dropped.
+        """
+        written = 0
+        while rows := self._take():
+            chunks = [rows]
+            while chunks:
+                chunk = chunks.pop()
+                try:
+                    async with async_engine.begin() as conn:
+                        await conn.execute(insert(Event), chunk)
+                except (OperationalError, InterfaceError):
+                    # The database is unreachable; keep the events for the next try
+                    with self._lock:
+                        self._failed_flushes += 1
+                    self._requeue(
+                        [row for c in [chunk, *reversed(chunks)] for row in c]
+                    )
+                    raise
+                except (IntegrityError, DataError):
+                    # e.g. an item deleted since the event was emitted
+                    with self._lock:
+                        self._failed_flushes += 1
+                    if len(chunk) == 1:
+                        logger.warning(
+                            "Dropped event rejected by the database: %s", chunk[0]["id"]
+                        )
+                        with self._lock:
+                            self._dropped += 1
+                        continue
+                    middle = len(chunk) // 2
+                    chunks += [chunk[middle:], chunk[:middle]]
+                    continue
+                except Exception:
+                    with self._lock:
+                        self._failed_flushes += 1
+                        self._dropped += sum(len(c) for c in [chunk, *chunks])
+                    raise
+                except BaseException:
+                    # Cancelled, e.g. on shutdown; the final flush writes them
+                    self._requeue(
+                        [row for c in [chunk, *reversed(chunks)] for row in c]
+                    )
+                    raise
+                with self._lock:
+                    self._flushed += len(chunk)
+                written += len(chunk)
+        return written
+
+    async def run(self) -> None:
+        """Flush on size or time thresholds until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                self._wakeup.clear()
+                try:
+                    await self.flush()
+                except Exception:
+                    logger.exception("Failed to flush events")
+        finally:
+            self._loop = self._wakeup = None
+
+    def stats(self) -> EventSinkStats:
+        with self._lock:
+            return EventSinkStats(
+                maxsize=self.maxsize,
+                buffered=len(self._pending),
+                accepted=self._accepted,
+                flushed=self._flushed,
+                dropped=self._dropped,
+                failed_flushes=self._failed_flushes,
+            )
+
+
+event_sink = EventSink(
+    maxsize=settings.EVENT_BUFFER_SIZE,
+    batch_size=settings.EVENT_FLUSH_BATCH_SIZE,
+    flush_interval=settings.EVENT_FLUSH_INTERVAL_SECONDS,
+)
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from app.core.config import settings
+from app.models import HashingPoolStats
+
+
+class HashingPoolFull(Exception):
+    """Raised instead of queueing when the hashing pool has no capacity left."""
+
+
+class HashingPool:
+    """
+    Dedicated, size-limited executor for password hashing.
+
+    bcrypt and argon2 release the GIL while hashing, so worker threads run in
+    parallel without stalling the event loop or Starlette's shared threadpool.
+    At most ``max_workers`` hashes run and ``max_queue`` wait; further calls
+    fail fast with ``HashingPoolFull``.
+    """
+
+    def __init__(self, *, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._max_run_seconds = 0.0
+
+    async def run[**P, T](
+        self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HashingPoolFull
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="hashing"
+                )
+            self._in_flight += 1
+            executor = self._executor
+
+        submitted = time.perf_counter()
+
+        def call() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+
+        future = executor.submit(call)
+        # Runs on completion and on cancellation before the job started
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future: Future[Any]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record(self, waited: float, ran: float) -> None:
+        with self._lock:
+            self._completed += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+            self._run_seconds += ran
+            self._max_run_seconds = max(self._max_run_seconds, ran)
+
+    def stats(self) -> HashingPoolStats:
+        with self._lock:
+            completed = self._completed or 1
+            return HashingPoolStats(
+                workers=self.max_workers,
+                queue_limit=self.max_queue,
+                in_flight=self._in_flight,
+                queued=max(self._in_flight - self.max_workers, 0),
+                completed=self._completed,
+                rejected=self._rejected,
+                avg_wait_ms=self._wait_seconds / completed * 1000,
+                max_wait_ms=self._max_wait_seconds * 1000,
+                avg_run_ms=self._run_seconds / completed * 1000,
+                max_run_ms=self._max_run_seconds * 1000,
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.HASHING_POOL_SIZE, max_queue=settings.HASHING_QUEUE_SIZE
+)
@@ -0,0 +1,92 @@
+import logging
+import re
+from datetime import date, datetime
+
+from sqlalchemy import Connection, text
+
+logger = logging.getLogger(__name__)
+
+# Monthly partitions of the event table are named event_YYYY_MM; rows outside
+# every month range land in event_default, which should stay empty.
+EVENT_TABLE = "event"
+EVENT_DEFAULT_PARTITION = "event_default"
+PARTITION_NAME = re.compile(r"^event_(\d{4})_(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{EVENT_TABLE}_{month:%Y_%m}"
+
+
+def is_partition_table(name: str) -> bool:
+    """Whether ``name`` is a partition of the event table, not a model table."""
+    return name == EVENT_DEFAULT_PARTITION or PARTITION_NAME.match(name) is not None
+
+
+def existing_partitions(conn: Connection) -> dict[date, str]:
+    """Monthly partitions currently attached to the event table, by month."""
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": EVENT_TABLE},
+    ).scalars()
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def create_partitions(
+    conn: Connection, *, now: datetime, months_ahead: int
+) -> list[str]:
+    """Create the partitions from the current month to ``months_ahead`` months later."""
+    existing = existing_partitions(conn)
+    created = []
+    current = month_start(now.date())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        name = partition_name(month)
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {EVENT_TABLE} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+        )
+        logger.info("Created partition %s", name)
+        created.append(name)
+    return created
+
+
+def drop_expired_partitions(
+    conn: Connection, *, now: datetime, retention_months: int
+) -> list[str]:
+    """
+    Drop the partitions whose whole month is older than the retention.
+
+    Dropping a partition briefly locks the event table. Detaching it
+    CONCURRENTLY first is not possible while the default partition exists.
+    """
+    cutoff = add_months(month_start(now.date()), -retention_months)
+    dropped = []
+    for month, name in sorted(existing_partitions(conn).items()):
+        if add_months(month, 1) > cutoff:
+            break
+        conn.execute(text(f"DROP TABLE {name}"))
+        logger.info("Dropped partition %s", name)
+        dropped.append(name)
+    return dropped
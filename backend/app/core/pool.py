@@ -0,0 +1,137 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    PoolProxiedConnection,
+    QueuePool,
+)
+
+from app.models import PoolStats
+
+
+class PoolMonitor:
+    """
+    Counters for the connection pool of one engine.
+
+    Connections opened, checked out and invalidated are counted by pool event
+    listeners. SQLAlchemy has no event for the start of a checkout, so the
+    time spent waiting for a connection is reported by ``MonitoredQueuePool``.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._engine: Engine | None = None
+        self._lock = threading.Lock()
+        self._checked_out = 0
+        self._max_checked_out = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._connects = 0
+        self._invalidations = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def attach(self, engine: Engine) -> None:
+        self._engine = engine
+        pool = engine.pool
+        if isinstance(pool, MonitoredQueuePool):
+            pool.monitor = self
+        # Listeners survive Engine.dispose(), which recreates the pool
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, _dbapi_connection: Any, _record: ConnectionPoolEntry) -> None:
+        with self._lock:
+            self._connects += 1
+
+    def _on_checkout(
+        self,
+        _dbapi_connection: Any,
+        _record: ConnectionPoolEntry,
+        _proxy: PoolProxiedConnection,
+    ) -> None:
+        with self._lock:
+            self._checkouts += 1
+            self._checked_out += 1
+            self._max_checked_out = max(self._max_checked_out, self._checked_out)
+
+    def _on_checkin(self, _dbapi_connection: Any, _record: ConnectionPoolEntry) -> None:
+        with self._lock:
+            self._checked_out = max(self._checked_out - 1, 0)
+
+    def _on_invalidate(
+        self,
+        _dbapi_connection: Any,
+        _record: ConnectionPoolEntry,
+        _exception: BaseException | None,
+    ) -> None:
+        with self._lock:
+            self._invalidations += 1
+
+    def record_wait(self, waited: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self._timeouts += 1
+            self._waits += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+    def stats(self) -> PoolStats:
+        assert self._engine is not None, "PoolMonitor.attach() was not called"
+        pool = self._engine.pool
+        assert isinstance(pool, QueuePool)
+        with self._lock:
+            return PoolStats(
+                name=self.name,
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                # Negative while the pool has not opened pool_size connections
+                overflow=max(pool.overflow(), 0),
+                max_checked_out=self._max_checked_out,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                connects=self._connects,
+                invalidations=self._invalidations,
+                avg_wait_ms=self._wait_seconds / self._waits * 1000
+                if self._waits
+                else 0.0,
+                max_wait_ms=self._max_wait_seconds * 1000,
+            )
+
+
+class MonitoredQueuePool(QueuePool):
+    """``QueuePool`` that reports checkout wait times to its monitor."""
+
+    monitor: PoolMonitor | None = None
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.monitor is not None:
+                self.monitor.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.monitor is not None:
+            self.monitor.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> QueuePool:
+        pool = super().recreate()
+        assert isinstance(pool, MonitoredQueuePool)
+        pool.monitor = self.monitor
+        return pool
+
+
+class MonitoredAsyncQueuePool(MonitoredQueuePool, AsyncAdaptedQueuePool):
+    """The asyncio variant, used by ``create_async_engine``."""
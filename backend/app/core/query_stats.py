@@ -0,0 +1,103 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Connection, Engine, ExceptionContext, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements that ran more than ``threshold`` times, most frequent first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn: Connection, *_args: Any) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Connection, _cursor: Any, statement: str, *_args: Any
+) -> None:
+    stats = _current.get()
+    started_at = conn.info.get("query_started_at")
+    if stats is None or not started_at:
+        return
+    stats.count += 1
+    stats.seconds += time.perf_counter() - started_at.pop()
+    # Parameters are bound separately, so the SQL text is the statement's shape
+    stats.statements[statement] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context: ExceptionContext) -> None:
+    # after_cursor_execute does not run for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+class QueryStatsMiddleware:
+    """
+    Count the queries of every request and report them in response headers.
+
+    ``X-DB-Queries`` and ``Server-Timing`` cover the statements run before the
+    response started. Statements repeated more than
+    ``REPEATED_QUERY_WARNING_THRESHOLD`` times in one request, typically lazy
+    loads in a loop, are logged as warnings.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", str(stats.count))
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            threshold = settings.REPEATED_QUERY_WARNING_THRESHOLD
+            for statement, times in stats.repeated(threshold):
+                logger.warning(
+                    "%s %s ran the same statement %d times (possible N+1): %s",
+                    scope["method"],
+                    scope["path"],
+                    times,
+                    statement,
+                )
@@ -0,0 +1,108 @@
+import math
+import threading
+import time
+from typing import Protocol
+
+from app.core.config import settings
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(math.ceil(self.retry_after), 1))
+
+
+class RateLimitBackend(Protocol):
+    """
+    Storage for token buckets.
+
+    The in-memory backend below is per process; an implementation backed by a
+    shared store (e.g. Redis with a Lua script) makes limits global.
+    """
+
+    async def take(self, key: str, *, capacity: float, refill_rate: float) -> float:
+        """
+        Take one token from the bucket ``key``, creating it full if missing.
+
+        Returns 0 when a token was taken, otherwise the seconds until one is
+        available.
+        """
+        ...
+
+
+class InMemoryRateLimitBackend:
+    """
+    Token buckets in a dict: two floats per active key.
+
+    Buckets that have refilled completely are indistinguishable from new ones,
+    so they are dropped by a sweep that runs at most every ``evict_interval``.
+    """
+
+    def __init__(self, evict_interval: float = 60) -> None:
+        self.evict_interval = evict_interval
+        # key -> (tokens, last update, time at which the bucket is full again)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._next_eviction = time.monotonic() + evict_interval
+
+    async def take(self, key: str, *, capacity: float, refill_rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_eviction:
+                self._evict(now)
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            retry_after = 0.0
+            if tokens < 1:
+                retry_after = (1 - tokens) / refill_rate
+            else:
+                tokens -= 1
+            full_at = now + (capacity - tokens) / refill_rate
+            self._buckets[key] = (tokens, now, full_at)
+            return retry_after
+
+    def _evict(self, now: float) -> None:
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if bucket[2] > now
+        }
+        self._next_eviction = now + self.evict_interval
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+rate_limit_backend: RateLimitBackend = InMemoryRateLimitBackend()
+
+
+class RateLimit:
+    """Allow bursts of ``per_minute`` requests per key, refilled evenly."""
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: int,
+        backend: RateLimitBackend | None = None,
+    ) -> None:
+        self.name = name
+        self.per_minute = per_minute
+        self.backend = backend
+
+    async def hit(self, key: str) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        backend = self.backend or rate_limit_backend
+        retry_after = await backend.take(
+            f"{self.name}:{key}",
+            capacity=self.per_minute,
+            refill_rate=self.per_minute / 60,
+        )
+        if retry_after > 0:
+            raise RateLimitExceeded(retry_after)
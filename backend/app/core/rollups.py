@@ -0,0 +1,187 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import BigInteger, Connection, Select, cast, func, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, update
+
+from app.models import (
+    Event,
+    EventDailyCount,
+    EventGranularity,
+    EventHourlyCount,
+    EventRollupState,
+)
+
+logger = logging.getLogger(__name__)
+
+EVENT_ROLLUP = "event"
+ROLLUPS: dict[EventGranularity, type[EventHourlyCount] | type[EventDailyCount]] = {
+    EventGranularity.hour: EventHourlyCount,
+    EventGranularity.day: EventDailyCount,
+}
+_KEY = ["bucket", "event_type", "organization_id", "model_id"]
+
+
+def bucket_start(value: datetime, granularity: EventGranularity) -> datetime:
+    """Start of the bucket containing ``value``, like SQL ``date_trunc``."""
+    start = value.replace(minute=0, second=0, microsecond=0)
+    if granularity is EventGranularity.day:
+        start = start.replace(hour=0)
+    return start
+
+
+def bucket_after(value: datetime, granularity: EventGranularity) -> datetime:
+    """The first bucket boundary at or after ``value``."""
+    start = bucket_start(value, granularity)
+    if start == value:
+        return start
+    step = (
+        timedelta(days=1) if granularity is EventGranularity.day else timedelta(hours=1)
+    )
+    return start + step
+
+
+def _roll_up(conn: Connection, start: datetime, end: datetime) -> None:
+    for granularity, rollup in ROLLUPS.items():
+        bucket = func.date_trunc(granularity.value, Event.created_at)
+        counts = (
+            select(
+                bucket,
+                col(Event.event_type),
+                col(Event.organization_id),
+                col(Event.model_id),
+                func.count(),
+            )
+            .where(col(Event.created_at) >= start, col(Event.created_at) < end)
+            .group_by(
+                bucket,
+                col(Event.event_type),
+                col(Event.organization_id),
+                col(Event.model_id),
+            )
+        )
+        statement = insert(rollup).from_select([*_KEY, "event_count"], counts)
+        statement = statement.on_conflict_do_update(
+            index_elements=_KEY,
+            set_={
+                "event_count": col(rollup.event_count) + statement.excluded.event_count
+            },
+        )
+        conn.execute(statement)
+
+
+def refresh_event_rollups(
+    conn: Connection, *, now: datetime, lag: timedelta, window: timedelta
+) -> datetime | None:
+    """
+    Add the events created since the watermark to the rollups.
+
+    Counts events up to ``now - lag``, committing and advancing the watermark
+    every ``window`` so that a backfill does not run as one huge transaction.
+    Concurrent refreshers wait on the lock of the watermark row. Returns the
+    new watermark, None if there are no events yet.
+    """
+    target = now - lag
+    while True:
+        with conn.begin():
+            watermark: datetime | None = conn.execute(
+                select(col(EventRollupState.watermark))
+                .where(col(EventRollupState.name) == EVENT_ROLLUP)
+                .with_for_update()
+            ).scalar_one()
+            start = watermark
+            if start is None:
+                start = conn.execute(
+                    select(func.min(col(Event.created_at)))
+                ).scalar_one()
+                if start is None:
+                    return None
+            end = min(start + window, target)
+            if end <= start:
+                return watermark
+            _roll_up(conn, start, end)
+            conn.execute(
+                update(EventRollupState)
+                .where(col(EventRollupState.name) == EVENT_ROLLUP)
+                .values(watermark=end)
+            )
+        logger.info("Rolled up events from %s to %s", start, end)
+        if end == target:
+            return end
+
+
+def event_counts(
+    granularity: EventGranularity,
+    *,
+    start: datetime,
+    end: datetime,
+    event_type: str | None = None,
+    organization_id: uuid.UUID | None = None,
+    model_id: uuid.UUID | None = None,
+) -> Select[Any]:
+    """
+    Event counts for the buckets in [start, end), which must be bucket boundaries.
+
+    Reads the rollups, and the event table from the watermark on. The
+    watermark is read in the same statement, so both parts see one snapshot
+    even while a refresh commits.
+    """
+    rollup = ROLLUPS[granularity]
+    watermark = (
+        select(col(EventRollupState.watermark))
+        .where(col(EventRollupState.name) == EVENT_ROLLUP)
+        .scalar_subquery()
+    )
+    rollup_filters = [col(rollup.bucket) >= start, col(rollup.bucket) < end]
+    tail_filters = [
+        col(Event.created_at) >= func.greatest(start, func.coalesce(watermark, start)),
+        col(Event.created_at) < end,
+    ]
+    for column, value in [
+        ("event_type", event_type),
+        ("organization_id", organization_id),
+        ("model_id", model_id),
+    ]:
+        if value is not None:
+            rollup_filters.append(getattr(rollup, column) == value)
+            tail_filters.append(getattr(Event, column) == value)
+
+    rolled: Select[Any] = select(
+        col(rollup.bucket),
+        col(rollup.event_type),
+        col(rollup.organization_id),
+        col(rollup.model_id),
+        col(rollup.event_count).label("count"),
+    ).where(*rollup_filters)
+    bucket = func.date_trunc(granularity.value, Event.created_at)
+    tail = (
+        select(
+            bucket.label("bucket"),
+            col(Event.event_type),
+            col(Event.organization_id),
+            col(Event.model_id),
+            func.count().label("count"),
+        )
+        .where(*tail_filters)
+        .group_by(
+            bucket,
+            col(Event.event_type),
+            col(Event.organization_id),
+            col(Event.model_id),
+        )
+    )
+    counts = union_all(rolled, tail).subquery()
+    key = [
+        counts.c.bucket,
+        counts.c.event_type,
+        counts.c.organization_id,
+        counts.c.model_id,
+    ]
+    return (
+        select(*key, cast(func.sum(counts.c.count), BigInteger).label("count"))
+        .group_by(*key)
+        .order_by(*key)
+    )
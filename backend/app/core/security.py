@@ -5,8 +5,38 @@ import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.hashing import hashing_pool
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def make_pwd_context(
+    scheme: str = settings.PASSWORD_HASH_SCHEME,
+    *,
+    bcrypt_rounds: int = settings.BCRYPT_ROUNDS,
+    argon2_time_cost: int = settings.ARGON2_TIME_COST,
+    argon2_memory_cost: int = settings.ARGON2_MEMORY_COST_KIB,
+    argon2_parallelism: int = settings.ARGON2_PARALLELISM,
+) -> CryptContext:
+    """
+    Hash new passwords with ``scheme`` at the given cost.
+
+    Both schemes stay verifiable; hashes from the other scheme, or with
+    different cost parameters, are reported by ``needs_update``.
+    """
+    context = CryptContext(
+        schemes=["bcrypt", "argon2"],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+    if not context.handler(scheme).has_backend():
+        raise RuntimeError(f"No backend for {scheme}, install argon2-cffi")
+    return context
+
+
+pwd_context = make_pwd_context()
 
 
 ALGORITHM = "HS256"
@@ -23,5 +53,33 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify a password, and rehash it if the stored hash is outdated.
+
+    Returns whether the password matched and, if so and the hash uses an old
+    scheme or cost, the replacement hash.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await hashing_pool.run(
+        verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_pool.run(get_password_hash, password)
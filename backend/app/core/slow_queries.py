@@ -0,0 +1,229 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Connection, Engine, ExceptionContext, event
+from sqlalchemy.engine.default import DefaultExecutionContext
+
+from app.models import SlowQueryStats
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+_SPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so that executions differing only in values match.
+
+    Literals and placeholders become ``?``, IN lists and multi-row VALUES
+    collapse to one entry, and whitespace is squeezed.
+    """
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    sql = _ROWS.sub(r"\1, ...", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class _Entry:
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seen: datetime | None = None
+    plan: str | None = None
+    # time.monotonic() of the last EXPLAIN, successful or not
+    explained_at: float | None = None
+    explaining: bool = False
+
+
+class SlowQueryLog:
+    """
+    Log statements slower than ``threshold_ms`` and aggregate them by fingerprint.
+
+    Parameters are never logged. A plan is captured for a fingerprint at most
+    once per ``explain_interval`` seconds, on a background thread and a
+    separate connection to ``explain_engine``, inside a read-only transaction
+    with a statement timeout. Only statements that do not write are run with
+    ANALYZE, since that executes them again.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold_ms: float | None,
+        explain_engine: Engine | None,
+        explain_analyze: bool = True,
+        explain_interval: float = 300,
+        explain_timeout_ms: int = 5000,
+        max_fingerprints: int = 500,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_engine = explain_engine
+        self.explain_analyze = explain_analyze
+        self.explain_interval = explain_interval
+        self.explain_timeout_ms = explain_timeout_ms
+        self.max_fingerprints = max_fingerprints
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn: Connection, *_args: Any) -> None:
+        conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self,
+        conn: Connection,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: DefaultExecutionContext | None,
+        executemany: bool,
+    ) -> None:
+        started_at = conn.info.get("slow_query_started_at")
+        if not started_at:
+            return
+        elapsed = time.perf_counter() - started_at.pop()
+        if self.threshold_ms is None or elapsed * 1000 < self.threshold_ms:
+            return
+        if conn.get_execution_options().get("slow_query_log") is False:
+            return
+        writes = context is None or bool(
+            context.isinsert or context.isupdate or context.isdelete
+        )
+        self.record(
+            statement,
+            elapsed,
+            parameters=None if executemany else parameters,
+            analyze=not writes,
+        )
+
+    def _handle_error(self, exception_context: ExceptionContext) -> None:
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("slow_query_started_at"):
+            conn.info["slow_query_started_at"].pop()
+
+    def record(
+        self,
+        statement: str,
+        elapsed: float,
+        *,
+        parameters: Any = None,
+        analyze: bool = False,
+    ) -> None:
+        """
+        Account one slow execution; ``parameters`` are only used for EXPLAIN.
+
+        Pass ``parameters=None`` for executemany batches, which are not explained.
+        """
+        key = fingerprint(statement)
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    # Make room by forgetting the cheapest fingerprint
+                    cheapest = min(
+                        self._entries, key=lambda k: self._entries[k].total_seconds
+                    )
+                    del self._entries[cheapest]
+                entry = self._entries[key] = _Entry()
+            entry.calls += 1
+            entry.total_seconds += elapsed
+            entry.max_seconds = max(entry.max_seconds, elapsed)
+            entry.last_seen = datetime.utcnow()
+            explain = (
+                self.explain_engine is not None
+                and parameters is not None
+                and _EXPLAINABLE.match(statement) is not None
+                and not entry.explaining
+                and (
+                    entry.explained_at is None
+                    or now - entry.explained_at >= self.explain_interval
+                )
+            )
+            if explain:
+                entry.explaining = True
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="explain"
+                    )
+                executor = self._executor
+        if explain:
+            executor.submit(self._explain, entry, statement, parameters, analyze)
+
+    def _explain(
+        self, entry: _Entry, statement: str, parameters: Any, analyze: bool
+    ) -> None:
+        assert self.explain_engine is not None
+        options = "ANALYZE, BUFFERS" if analyze and self.explain_analyze else "COSTS"
+        plan = None
+        try:
+            with self.explain_engine.connect() as conn:
+                conn.execution_options(slow_query_log=False)
+                conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}"
+                )
+                lines = conn.exec_driver_sql(
+                    f"EXPLAIN ({options}) {statement}", parameters
+                ).scalars()
+                plan = "\n".join(lines)
+                conn.rollback()
+        except Exception:
+            logger.exception("Failed to explain slow query")
+        with self._lock:
+            entry.explaining = False
+            entry.explained_at = time.monotonic()
+            if plan is not None:
+                entry.plan = plan
+
+    def top(self, limit: int) -> list[SlowQueryStats]:
+        """The fingerprints with the highest total time."""
+        with self._lock:
+            entries = sorted(
+                self._entries.items(),
+                key=lambda item: item[1].total_seconds,
+                reverse=True,
+            )[:limit]
+            return [
+                SlowQueryStats(
+                    fingerprint=key,
+                    calls=entry.calls,
+                    total_ms=entry.total_seconds * 1000,
+                    mean_ms=entry.total_seconds / entry.calls * 1000,
+                    max_ms=entry.max_seconds * 1000,
+                    last_seen=entry.last_seen,
+                    plan=entry.plan,
+                )
+                for key, entry in entries
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
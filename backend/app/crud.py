@@ -1,33 +1,146 @@
 import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import ColumnElement, insert
+from sqlmodel import Session, SQLModel, col, func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.core.cache import invalidate_user
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
+from app.models import (
+    Item,
+    ItemCreate,
+    OwnerItemCount,
+    User,
+    UserCreate,
+    UserUpdate,
+)
+
+# Single-statement writes. Each helper sends one INSERT/UPDATE ... RETURNING
+# and a COMMIT instead of flush, commit and a refresh SELECT. Sessions should
+# use expire_on_commit=False so the returned objects stay loaded.
+
+
+def _insert_statement[T: SQLModel](obj: T) -> Any:
+    model = type(obj)
+    return insert(model).values(**obj.model_dump()).returning(model)
+
+
+def _update_statement(
+    model: Any,
+    id: uuid.UUID,
+    values: dict[str, Any],
+    where: Sequence[ColumnElement[bool]],
+) -> Any:
+    return (
+        update(model)
+        .where(col(model.id) == id, *where)
+        .values(**values)
+        .returning(model)
+    )
+
+
+# The returned row also refreshes an instance already in the session
+_RETURNING_OPTIONS = {"synchronize_session": False, "populate_existing": True}
+
+
+def insert_returning[T: SQLModel](*, session: Session, obj: T) -> T:
+    """INSERT ``obj`` and commit, returning the row as stored."""
+    row: T = session.exec(
+        _insert_statement(obj), execution_options=_RETURNING_OPTIONS
+    ).scalar_one()
+    session.commit()
+    return row
+
+
+def update_returning[T: SQLModel](
+    *,
+    session: Session,
+    model: type[T],
+    id: uuid.UUID,
+    values: dict[str, Any],
+    where: Sequence[ColumnElement[bool]] = (),
+) -> T | None:
+    """
+    UPDATE the row ``id`` if it also matches ``where`` and commit.
+
+    Returns the updated row, or None if no row matched.
+    """
+    statement = _update_statement(model, id, values, where)
+    row: T | None = session.exec(
+        statement, execution_options=_RETURNING_OPTIONS
+    ).scalar_one_or_none()
+    session.commit()
+    return row
+
+
+async def insert_returning_async[T: SQLModel](*, session: AsyncSession, obj: T) -> T:
+    """INSERT ``obj`` and commit, returning the row as stored."""
+    result = await session.exec(
+        _insert_statement(obj), execution_options=_RETURNING_OPTIONS
+    )
+    row: T = result.scalar_one()
+    await session.commit()
+    return row
+
+
+async def update_returning_async[T: SQLModel](
+    *,
+    session: AsyncSession,
+    model: type[T],
+    id: uuid.UUID,
+    values: dict[str, Any],
+    where: Sequence[ColumnElement[bool]] = (),
+) -> T | None:
+    """
+    UPDATE the row ``id`` if it also matches ``where`` and commit.
+
+    Returns the updated row, or None if no row matched.
+    """
+    statement = _update_statement(model, id, values, where)
+    result = await session.exec(statement, execution_options=_RETURNING_OPTIONS)
+    row: T | None = result.scalar_one_or_none()
+    await session.commit()
+    return row
+
+
+def _user_update_values(
+    user_data: dict[str, Any], hashed_password: str | None
+) -> dict[str, Any]:
+    values = {key: value for key, value in user_data.items() if key != "password"}
+    if hashed_password is not None:
+        values["hashed_password"] = hashed_password
+    values["updated_at"] = datetime.utcnow()
+    return values
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
     db_obj = User.model_validate(
         user_create, update={"hashed_password": get_password_hash(user_create.password)}
     )
-    session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
-    return db_obj
+    return insert_returning(session=session, obj=db_obj)
 
 
 def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> User:
     user_data = user_in.model_dump(exclude_unset=True)
-    extra_data = {}
-    if "password" in user_data and user_data["password"] is not None:
-        password = user_data["password"]
-        hashed_password = get_password_hash(password)
-        extra_data["hashed_password"] = hashed_password
-    db_user.sqlmodel_update(user_data, update=extra_data)
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
-    return db_user
+    hashed_password = None
+    if user_data.get("password") is not None:
+        hashed_password = get_password_hash(user_data["password"])
+    user = update_returning(
+        session=session,
+        model=User,
+        id=db_user.id,
+        values=_user_update_values(user_data, hashed_password),
+    )
+    invalidate_user(db_user.id)
+    return user or db_user
 
 
 def get_user_by_email(*, session: Session, email: str) -> User | None:
@@ -42,8 +155,67 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
         return None
     if not db_user.is_active:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        # Stored with an outdated scheme or cost: upgrade while we know the password
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        session.commit()
+        invalidate_user(db_user.id)
+    return db_user
+
+
+async def create_user_async(*, session: AsyncSession, user_create: UserCreate) -> User:
+    hashed_password = await get_password_hash_async(user_create.password)
+    db_obj = User.model_validate(
+        user_create, update={"hashed_password": hashed_password}
+    )
+    return await insert_returning_async(session=session, obj=db_obj)
+
+
+async def update_user_async(
+    *, session: AsyncSession, user_id: uuid.UUID, user_in: UserUpdate
+) -> User | None:
+    """Update a user in one statement; None if the user does not exist."""
+    user_data = user_in.model_dump(exclude_unset=True)
+    hashed_password = None
+    if user_data.get("password") is not None:
+        hashed_password = await get_password_hash_async(user_data["password"])
+    user = await update_returning_async(
+        session=session,
+        model=User,
+        id=user_id,
+        values=_user_update_values(user_data, hashed_password),
+    )
+    invalidate_user(user_id)
+    return user
+
+
+async def get_user_by_email_async(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    return (await session.exec(statement)).first()
+
+
+async def authenticate_async(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email_async(session=session, email=email)
+    if not db_user:
+        return None
+    if not db_user.is_active:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        await session.commit()
+        invalidate_user(db_user.id)
     return db_user
 
 
@@ -57,7 +229,17 @@ def create_item(
     # Ensure required foreign keys are present per extended model
     if db_item.owner_id is None:
         raise ValueError("owner_id is required to create Item")
-    session.add(db_item)
-    session.commit()
-    session.refresh(db_item)
-    return db_item
+    return insert_returning(session=session, obj=db_item)
+
+
+async def get_cached_item_count_async(
+    *, session: AsyncSession, owner_id: uuid.UUID | None
+) -> int:
+    """Read the trigger-maintained item counter for one owner, or for everyone."""
+    if owner_id is None:
+        statement = select(func.coalesce(func.sum(OwnerItemCount.item_count), 0))
+    else:
+        statement = select(OwnerItemCount.item_count).where(
+            OwnerItemCount.owner_id == owner_id
+        )
+    return int((await session.exec(statement)).first() or 0)
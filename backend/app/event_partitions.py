@@ -0,0 +1,45 @@
+"""
+Create upcoming monthly partitions of the event table and drop expired ones.
+
+    python -m app.event_partitions [--months-ahead 3] [--retention-months 12]
+
+Run it daily, e.g. from cron; it is idempotent. Events dated past the last
+partition are stored in event_default, and Postgres refuses to create a
+partition whose range covers rows there, so keep enough months ahead.
+"""
+
+import argparse
+import logging
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.partitions import create_partitions, drop_expired_partitions
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.EVENT_PARTITIONS_AHEAD_MONTHS
+    )
+    parser.add_argument(
+        "--retention-months", type=int, default=settings.EVENT_RETENTION_MONTHS
+    )
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        created = create_partitions(conn, now=now, months_ahead=args.months_ahead)
+        dropped = []
+        if args.retention_months is not None:
+            dropped = drop_expired_partitions(
+                conn, now=now, retention_months=args.retention_months
+            )
+    logger.info("%d partitions created, %d dropped", len(created), len(dropped))
+
+
+if __name__ == "__main__":
+    main()
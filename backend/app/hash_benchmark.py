@@ -0,0 +1,84 @@
+"""
+Measure password hashing throughput for candidate scheme / cost settings.
+
+    python -m app.hash_benchmark --seconds 3 --bcrypt-rounds 10 12 \
+        --argon2 2:19456:1 3:65536:4
+
+Each configuration is timed on a single thread, so the rate is hashes per
+second per core; multiply by HASHING_POOL_SIZE for a worker's capacity.
+"""
+
+import argparse
+import logging
+import time
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.security import make_pwd_context
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def measure(context: CryptContext, seconds: float) -> tuple[float, float]:
+    """Hash for about ``seconds``; return (hashes per second, ms per hash)."""
+    count = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds or count == 0:
+        context.hash("correct horse battery staple")
+        count += 1
+        elapsed = time.perf_counter() - started
+    return count / elapsed, elapsed / count * 1000
+
+
+def configurations(
+    bcrypt_rounds: list[int], argon2: list[str]
+) -> list[tuple[str, CryptContext]]:
+    found = [
+        (f"bcrypt rounds={rounds}", make_pwd_context("bcrypt", bcrypt_rounds=rounds))
+        for rounds in bcrypt_rounds
+    ]
+    for spec in argon2:
+        time_cost, memory_cost, parallelism = (int(part) for part in spec.split(":"))
+        try:
+            context = make_pwd_context(
+                "argon2",
+                argon2_time_cost=time_cost,
+                argon2_memory_cost=memory_cost,
+                argon2_parallelism=parallelism,
+            )
+        except RuntimeError as e:
+            logger.warning("Skipping argon2 %s: %s", spec, e)
+            continue
+        name = f"argon2 t={time_cost} m={memory_cost}KiB p={parallelism}"
+        found.append((name, context))
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument(
+        "--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12, 13]
+    )
+    parser.add_argument(
+        "--argon2",
+        nargs="*",
+        metavar="TIME:MEMORY_KIB:PARALLELISM",
+        default=[
+            f"{settings.ARGON2_TIME_COST}:{settings.ARGON2_MEMORY_COST_KIB}:"
+            f"{settings.ARGON2_PARALLELISM}",
+            "3:65536:4",
+        ],
+    )
+    args = parser.parse_args()
+
+    for name, context in configurations(args.bcrypt_rounds, args.argon2):
+        rate, latency = measure(context, args.seconds)
+        logger.info("%-40s %8.2f hashes/s/core %8.1f ms/hash", name, rate, latency)
+
+
+if __name__ == "__main__":
+    main()
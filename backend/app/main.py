@@ -1,10 +1,21 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.core.api_keys import api_key_usage
 from app.core.config import settings
+from app.core.db import async_engine, replica_async_engine, slow_query_log
+from app.core.event_sink import event_sink
+from app.core.hashing import HashingPoolFull, hashing_pool
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.rate_limit import RateLimitExceeded
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,12 +25,39 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    usage_flusher = asyncio.create_task(
+        api_key_usage.flush_periodically(settings.API_KEY_USAGE_FLUSH_SECONDS)
+    )
+    event_flusher = asyncio.create_task(event_sink.run())
+    yield
+    usage_flusher.cancel()
+    event_flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await usage_flusher
+    with suppress(asyncio.CancelledError):
+        await event_flusher
+    await api_key_usage.flush()
+    await event_sink.flush()
+    # Pooled async connections belong to the event loop that opened them
+    await async_engine.dispose()
+    if replica_async_engine is not None:
+        await replica_async_engine.dispose()
+    hashing_pool.shutdown()
+    slow_query_log.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
 )
 
+app.add_middleware(QueryStatsMiddleware)
+
 # Set all CORS enabled origins
 if settings.all_cors_origins:
     app.add_middleware(
@@ -30,4 +68,25 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+
+@app.exception_handler(HashingPoolFull)
+async def hashing_pool_full_handler(_request: Request, _exc: Exception) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many password operations, retry shortly"},
+        headers={"Retry-After": str(settings.HASHING_RETRY_AFTER_SECONDS)},
+    )
+
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(
+    _request: Request, exc: RateLimitExceeded
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests"},
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
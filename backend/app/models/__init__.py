@@ -9,10 +9,12 @@ from app.models.base import *
 from app.models.content import *
 from app.models.embedding import *
 from app.models.event import *
+from app.models.event_rollup import *
 from app.models.file_asset import *
 from app.models.item import *
 from app.models.link_tables import *
 from app.models.membership import *
+from app.models.metrics import *
 from app.models.organization import *
 from app.models.setting import *
 from app.models.tag import *
@@ -34,3 +34,17 @@ class APIKeyPublic(APIKeyBase):
     user_id: uuid.UUID
     created_at: datetime
     last_used_at: datetime | None
+
+
+class APIKeyCreateMe(APIKeyBase):
+    pass
+
+
+class APIKeyCreated(APIKeyPublic):
+    # The plain key, only returned once at creation
+    key: str
+
+
+class APIKeysPublic(SQLModel):
+    data: list[APIKeyPublic]
+    count: int
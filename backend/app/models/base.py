@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Any
 
 from sqlmodel import Field, SQLModel
@@ -37,6 +38,15 @@ class NewPassword(SQLModel):
     new_password: str = Field(min_length=8, max_length=128)
 
 
+class CountMode(str, Enum):
+    """How the `count` of a listing response was obtained."""
+
+    exact = "exact"  # SELECT count(*) over the filtered set
+    estimated = "estimated"  # planner statistics, may be off by a few percent
+    cached = "cached"  # trigger-maintained per-owner counters
+    none = "none"  # count was skipped
+
+
 class Pagination(SQLModel):
     limit: int = Field(default=100, le=1000)
     offset: int = Field(default=0, ge=0)
@@ -2,7 +2,8 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Computed, Index
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Column, Field, Relationship, SQLModel
 
 from .base import Timestamped
@@ -38,6 +39,16 @@ class Content(ContentBase, Timestamped, table=True):
     embedding: "Embedding" = Relationship(back_populates="content")
 
 
+# Generated full-text document, kept off the mapper like item.search_vector
+content_search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed("to_tsvector('english', text)", persisted=True),
+)
+SQLModel.metadata.tables["content"].append_column(content_search_vector)
+Index("ix_content_search_vector", content_search_vector, postgresql_using="gin")
+
+
 class ContentPublic(ContentBase):
     id: uuid.UUID
     item_id: uuid.UUID
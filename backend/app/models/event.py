@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Any
 
+from sqlalchemy import Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Column, Field, Relationship, SQLModel
 
@@ -24,7 +25,24 @@ class EventCreate(EventBase):
 
 
 class Event(EventBase, Timestamped, table=True):
+    # Range partitioned by month on created_at (see app/core/partitions.py), so
+    # created_at is part of the primary key. Filter on created_at where possible
+    # to let Postgres skip partitions.
+    __table_args__ = (
+        Index("ix_event_created_at_id", "created_at", "id"),
+        Index(
+            "ix_event_payload",
+            "payload",
+            postgresql_using="gin",
+            postgresql_ops={"payload": "jsonb_path_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
+    # Events are append-only, so neither timestamp needs its own index
+    updated_at: datetime | None = None
     actor_id: uuid.UUID | None = Field(
         foreign_key="user.id", nullable=True, index=True, ondelete="SET NULL"
     )
@@ -50,3 +68,12 @@ class EventPublic(EventBase):
     organization_id: uuid.UUID | None
     item_id: uuid.UUID | None
     created_at: datetime
+
+
+class EventsPublic(SQLModel):
+    data: list[EventPublic]
+    next_cursor: str | None = None
+
+
+class EventsAccepted(SQLModel):
+    accepted: int
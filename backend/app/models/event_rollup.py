@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import BigInteger, Index
+from sqlmodel import Field, SQLModel
+
+
+class EventGranularity(str, Enum):
+    hour = "hour"
+    day = "day"
+
+
+class EventRollupBase(SQLModel):
+    # Start of the bucket, naive UTC like Event.created_at
+    bucket: datetime
+    event_type: str = Field(max_length=100)
+    organization_id: uuid.UUID | None = Field(
+        default=None, foreign_key="organization.id", ondelete="CASCADE"
+    )
+    model_id: uuid.UUID | None = Field(
+        default=None, foreign_key="aimodel.id", ondelete="CASCADE"
+    )
+    event_count: int = Field(default=0, sa_type=BigInteger)
+
+
+def _rollup_indexes(table: str) -> tuple[Index, ...]:
+    return (
+        # NULL organizations and models are grouped like any other value,
+        # which also lets the refresher upsert on this index
+        Index(
+            f"ux_{table}_key",
+            "bucket",
+            "event_type",
+            "organization_id",
+            "model_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+        # Dashboards are usually scoped to one organization
+        Index(f"ix_{table}_organization_id_bucket", "organization_id", "bucket"),
+    )
+
+
+class EventHourlyCount(EventRollupBase, table=True):
+    """Events per hour, maintained by ``python -m app.event_rollups``."""
+
+    __table_args__ = _rollup_indexes("eventhourlycount")
+
+    id: int | None = Field(default=None, primary_key=True)
+
+
+class EventDailyCount(EventRollupBase, table=True):
+    """Events per day, maintained by ``python -m app.event_rollups``."""
+
+    __table_args__ = _rollup_indexes("eventdailycount")
+
+    id: int | None = Field(default=None, primary_key=True)
+
+
+class EventRollupState(SQLModel, table=True):
+    """How far the rollups have been refreshed."""
+
+    name: str = Field(max_length=100, primary_key=True)
+    # Events created before this are counted in the rollups; NULL until the
+    # first refresh
+    watermark: datetime | None = None
+
+
+class EventCount(SQLModel):
+    bucket: datetime
+    event_type: str
+    organization_id: uuid.UUID | None
+    model_id: uuid.UUID | None
+    count: int
+
+
+class EventCountsPublic(SQLModel):
+    data: list[EventCount]
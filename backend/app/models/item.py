@@ -2,10 +2,11 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Computed, Index
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Column, Field, Relationship, SQLModel
 
-from .base import Timestamped
+from .base import CountMode, Timestamped
 from .link_tables import ItemTagLink
 from .organization import Organization
 from .user import User
@@ -37,7 +38,24 @@ class ItemUpdate(SQLModel):
     meta_data: dict[str, Any] | None = None
 
 
+class ItemBulkUpdate(ItemUpdate):
+    id: uuid.UUID
+
+
 class Item(ItemBase, Timestamped, table=True):
+    # Keyset pagination walks (created_at, id), optionally scoped to an owner
+    __table_args__ = (
+        Index("ix_item_created_at_id", "created_at", "id"),
+        Index("ix_item_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # Serves @> containment filters on meta_data (not the ? operator)
+        Index(
+            "ix_item_meta_data",
+            "meta_data",
+            postgresql_using="gin",
+            postgresql_ops={"meta_data": "jsonb_path_ops"},
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, index=True, ondelete="CASCADE"
@@ -57,6 +75,21 @@ class Item(ItemBase, Timestamped, table=True):
     tags: list["Tag"] = Relationship(back_populates="items", link_model=ItemTagLink)
 
 
+# Generated full-text document. It is added to the table but not to the mapper,
+# so select(Item) never loads it; search queries reference it explicitly.
+item_search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+        persisted=True,
+    ),
+)
+SQLModel.metadata.tables["item"].append_column(item_search_vector)
+Index("ix_item_search_vector", item_search_vector, postgresql_using="gin")
+
+
 class ItemPublic(ItemBase):
     id: uuid.UUID
     owner_id: uuid.UUID
@@ -67,4 +100,41 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
+
+
+class ItemSearchHit(ItemPublic):
+    rank: float
+
+
+class ItemSearchResults(SQLModel):
+    data: list[ItemSearchHit]
+    next_cursor: str | None = None
+
+
+class ItemBulkError(SQLModel):
+    index: int  # position of the offending entry in the request body
+    id: uuid.UUID | None = None
+    status_code: int
+    detail: str
+
+
+class ItemsBulkResult(SQLModel):
+    data: list[ItemPublic]
+    errors: list[ItemBulkError]
+
+
+class ItemsBulkDeleted(SQLModel):
+    ids: list[uuid.UUID]
+    errors: list[ItemBulkError]
+
+
+class OwnerItemCount(SQLModel, table=True):
+    """Per-owner item counter, maintained by triggers on the item table."""
+
+    owner_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    item_count: int = Field(default=0, nullable=False)
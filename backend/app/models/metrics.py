@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from sqlmodel import SQLModel
+
+
+class HashingPoolStats(SQLModel):
+    workers: int
+    queue_limit: int
+    in_flight: int
+    queued: int
+    completed: int
+    rejected: int
+    avg_wait_ms: float
+    max_wait_ms: float
+    avg_run_ms: float
+    max_run_ms: float
+
+
+class CacheStats(SQLModel):
+    name: str
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class PoolStats(SQLModel):
+    name: str
+    size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_checked_out: int
+    checkouts: int
+    timeouts: int
+    connects: int
+    invalidations: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class SlowQueryStats(SQLModel):
+    fingerprint: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    last_seen: datetime | None
+    # Sampled EXPLAIN output; may contain parameter values
+    plan: str | None
+
+
+class EventSinkStats(SQLModel):
+    maxsize: int
+    buffered: int
+    accepted: int
+    flushed: int
+    dropped: int
+    failed_flushes: int
@@ -3,10 +3,11 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
 from pydantic import EmailStr
+from sqlalchemy import Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Column, Field, Relationship, SQLModel
 
-from .base import Timestamped
+from .base import CountMode, Timestamped
 
 if TYPE_CHECKING:  # pragma: no cover
     from .api_key import APIKey
@@ -54,6 +55,16 @@ class UserUpdateMe(SQLModel):
 
 
 class User(UserBase, Timestamped, table=True):
+    __table_args__ = (
+        Index("ix_user_created_at_id", "created_at", "id"),
+        Index(
+            "ix_user_extras",
+            "extras",
+            postgresql_using="gin",
+            postgresql_ops={"extras": "jsonb_path_ops"},
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
     # relationships defined after other models exist
@@ -75,4 +86,6 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
@@ -9,5 +9,8 @@ python app/backend_pre_start.py
 # Run migrations
 alembic upgrade head
 
+# Make sure the upcoming event partitions exist
+python -m app.event_partitions
+
 # Create initial data in DB
 python app/initial_data.py
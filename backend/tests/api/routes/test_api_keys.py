@@ -0,0 +1,173 @@
+import asyncio
+from contextlib import suppress
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.api_keys import api_key_usage
+from app.core.config import settings
+from app.core.db import engine
+
+
+def create_api_key(
+    client: TestClient, headers: dict[str, str], scopes: list[str]
+) -> dict[str, str]:
+    r = client.post(
+        f"{settings.API_V1_STR}/api-keys/",
+        headers=headers,
+        json={"description": "service", "scopes": scopes},
+    )
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_api_key_scopes(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    api_key = create_api_key(client, normal_user_token_headers, ["items:read"])
+    headers = {"X-API-Key": api_key["key"]}
+
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+    assert r.status_code == 200
+
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=headers,
+        json={"type": "generic", "title": "Forbidden"},
+    )
+    assert r.status_code == 403
+    assert r.json()["detail"] == "API key is missing scopes: items:write"
+    # Keys cannot mint other keys
+    r = client.get(f"{settings.API_V1_STR}/api-keys/", headers=headers)
+    assert r.status_code == 403
+
+
+def test_api_key_rejected_without_route_scope(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    api_key = create_api_key(client, normal_user_token_headers, ["items:read"])
+    headers = {"X-API-Key": api_key["key"]}
+    for method, path in [
+        ("GET", "/users/me"),
+        ("PATCH", "/users/me"),
+        ("DELETE", "/users/me"),
+    ]:
+        r = client.request(
+            method, f"{settings.API_V1_STR}{path}", headers=headers, json={}
+        )
+        assert r.status_code == 403
+        assert r.json()["detail"] == "API keys are not accepted on this route"
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    assert r.status_code == 200
+
+    # Nor do a superuser's keys reach the superuser routes
+    api_key = create_api_key(client, superuser_token_headers, ["items:read"])
+    headers = {"X-API-Key": api_key["key"]}
+    for method, path in [
+        ("GET", "/metrics/pools"),
+        ("GET", "/users/"),
+        ("PATCH", f"/users/{api_key['user_id']}"),
+        ("DELETE", f"/users/{api_key['user_id']}"),
+    ]:
+        r = client.request(
+            method, f"{settings.API_V1_STR}{path}", headers=headers, json={}
+        )
+        assert r.status_code == 403
+
+
+def test_api_key_unknown_scope(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/api-keys/",
+        headers=normal_user_token_headers,
+        json={"scopes": ["items:read", "admin"]},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Unknown scopes: admin"
+
+
+def test_api_key_invalid(client: TestClient) -> None:
+    for _ in range(2):
+        r = client.get(
+            f"{settings.API_V1_STR}/items/", headers={"X-API-Key": "sk_unknown"}
+        )
+        assert r.status_code == 403
+        assert r.json()["detail"] == "Invalid API key"
+
+
+def test_api_key_revoke(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    api_key = create_api_key(client, normal_user_token_headers, ["items:read"])
+    headers = {"X-API-Key": api_key["key"]}
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+    assert r.status_code == 200
+
+    r = client.delete(
+        f"{settings.API_V1_STR}/api-keys/{api_key['id']}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+    assert r.status_code == 403
+
+
+def test_api_key_last_used_at_flushed(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    api_key = create_api_key(client, normal_user_token_headers, ["items:read"])
+    r = client.get(
+        f"{settings.API_V1_STR}/items/", headers={"X-API-Key": api_key["key"]}
+    )
+    assert r.status_code == 200
+
+    def last_used_at() -> str | None:
+        r = client.get(
+            f"{settings.API_V1_STR}/api-keys/", headers=normal_user_token_headers
+        )
+        listed = {key["id"]: key for key in r.json()["data"]}
+        return listed[api_key["id"]]["last_used_at"]
+
+    assert last_used_at() is None
+    assert client.portal
+    client.portal.call(api_key_usage.flush)
+    assert last_used_at() is not None
+
+
+def test_api_key_last_used_at_kept_when_cancelled(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    api_key = create_api_key(client, normal_user_token_headers, ["items:read"])
+    r = client.get(
+        f"{settings.API_V1_STR}/items/", headers={"X-API-Key": api_key["key"]}
+    )
+    assert r.status_code == 200
+
+    async def cancel_flush() -> None:
+        flush = asyncio.create_task(api_key_usage.flush())
+        await asyncio.sleep(0.2)
+        flush.cancel()
+        with suppress(asyncio.CancelledError):
+            await flush
+
+    # The UPDATE waits on the lock until the flush is cancelled
+    assert client.portal
+    with engine.connect() as conn:
+        conn.execute(text("LOCK TABLE apikey IN EXCLUSIVE MODE"))
+        client.portal.call(cancel_flush)
+
+    client.portal.call(api_key_usage.flush)
+    r = client.get(
+        f"{settings.API_V1_STR}/api-keys/", headers=normal_user_token_headers
+    )
+    listed = {key["id"]: key for key in r.json()["data"]}
+    assert listed[api_key["id"]]["last_used_at"] is not None
+
+
+def test_missing_credentials(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/users/me")
+    assert r.status_code == 401
+    assert r.headers["WWW-Authenticate"] == "Bearer"
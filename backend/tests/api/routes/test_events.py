@@ -0,0 +1,254 @@
+import asyncio
+import uuid
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.event_sink import event_sink
+from app.models import Event, EventCreate
+from tests.utils.item import create_random_item
+from tests.utils.utils import random_lower_string
+
+
+def test_read_events_payload_filter(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    request_id = random_lower_string()
+    matching = Event(
+        event_type="item.viewed", payload={"request": request_id, "status": 200}
+    )
+    other = Event(
+        event_type="item.viewed", payload={"request": request_id, "status": 404}
+    )
+    db.add_all([matching, other])
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/events/",
+        headers=superuser_token_headers,
+        params={"payload": [f"request:{request_id}", "status:200"]},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [event["id"] for event in content["data"]] == [str(matching.id)]
+    assert content["next_cursor"] is None
+
+
+def test_read_events_only_own(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    request_id = random_lower_string()
+    db.add(Event(event_type="item.viewed", payload={"request": request_id}))
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/events/",
+        headers=normal_user_token_headers,
+        params={"payload": "request"},
+    )
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+
+
+def test_read_events_time_range(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    request_id = random_lower_string()
+    now = datetime.utcnow()
+    events = [
+        Event(
+            event_type="item.viewed",
+            payload={"request": request_id},
+            created_at=now - timedelta(days=days),
+        )
+        for days in (0, 1, 2)
+    ]
+    db.add_all(events)
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/events/",
+        headers=superuser_token_headers,
+        params={
+            "payload": f"request:{request_id}",
+            "since": (now - timedelta(days=1)).isoformat(),
+            "until": (now - timedelta(hours=1)).replace(tzinfo=UTC).isoformat(),
+        },
+    )
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()["data"]] == [str(events[1].id)]
+
+
+def test_create_events_batch(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    request_id = random_lower_string()
+    response = client.post(
+        f"{settings.API_V1_STR}/events/batch",
+        headers=normal_user_token_headers,
+        json=[
+            {"event_type": "item.viewed", "payload": {"request": request_id, "n": n}}
+            for n in range(3)
+        ],
+    )
+    assert response.status_code == 202
+    assert response.json() == {"accepted": 3}
+    statement = select(Event).where(Event.payload["request"].astext == request_id)
+    # Nothing is written while handling the request
+    assert db.exec(statement).all() == []
+
+    client.portal.call(event_sink.flush)
+    events = db.exec(statement).all()
+    assert sorted(event.payload["n"] for event in events) == [0, 1, 2]
+    assert all(event.actor_id is not None for event in events)
+
+
+def test_create_events_batch_other_actor(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    me = client.get(
+        f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers
+    ).json()
+    response = client.post(
+        f"{settings.API_V1_STR}/events/batch",
+        headers=normal_user_token_headers,
+        json=[{"event_type": "item.viewed", "actor_id": me["id"]}],
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Not enough permissions"}
+
+
+def test_create_events_batch_buffer_full(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    maxsize = event_sink.maxsize
+    dropped = event_sink.stats().dropped
+    event_sink.maxsize = 1
+    try:
+        response = client.post(
+            f"{settings.API_V1_STR}/events/batch",
+            headers=superuser_token_headers,
+            json=[{"event_type": "item.viewed"}, {"event_type": "item.viewed"}],
+        )
+    finally:
+        event_sink.maxsize = maxsize
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert event_sink.stats().dropped == dropped + 2
+
+
+def test_create_events_batch_items(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    other_item = create_random_item(db)
+    for item_id, detail in [
+        (uuid.uuid4(), "Item not found"),
+        (other_item.id, "Not enough permissions"),
+    ]:
+        response = client.post(
+            f"{settings.API_V1_STR}/events/batch",
+            headers=normal_user_token_headers,
+            json=[{"event_type": "item.viewed", "item_id": str(item_id)}],
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith(detail)
+
+    response = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"type": "generic", "title": "Viewed"},
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/events/batch",
+        headers=normal_user_token_headers,
+        json=[{"event_type": "item.viewed", "item_id": response.json()["id"]}],
+    )
+    assert response.status_code == 202
+
+
+def test_event_sink_drops_only_rejected_events(client: TestClient, db: Session) -> None:
+    event_type = random_lower_string()
+    dropped = event_sink.stats().dropped
+    events = [EventCreate(event_type=event_type, payload={"n": n}) for n in range(5)]
+    # An item deleted after the event was accepted
+    events.insert(2, EventCreate(event_type=event_type, item_id=uuid.uuid4()))
+    assert event_sink.emit_many(events)
+
+    client.portal.call(event_sink.flush)
+    stored = db.exec(select(Event).where(Event.event_type == event_type)).all()
+    assert sorted(event.payload["n"] for event in stored) == [0, 1, 2, 3, 4]
+    assert event_sink.stats().dropped == dropped + 1
+
+
+def test_event_sink_keeps_events_when_cancelled(
+    client: TestClient, db: Session
+) -> None:
+    event_type = random_lower_string()
+    assert event_sink.emit_many([EventCreate(event_type=event_type)] * 3)
+
+    async def cancel_flush() -> None:
+        flush = asyncio.create_task(event_sink.flush())
+        await asyncio.sleep(0.2)
+        flush.cancel()
+        with suppress(asyncio.CancelledError):
+            await flush
+
+    # The insert waits on the lock until the flush is cancelled
+    with engine.connect() as conn:
+        conn.execute(text("LOCK TABLE event IN EXCLUSIVE MODE"))
+        client.portal.call(cancel_flush)
+    assert event_sink.stats().buffered >= 3
+
+    client.portal.call(event_sink.flush)
+    stored = db.exec(select(Event).where(Event.event_type == event_type)).all()
+    assert len(stored) == 3
+
+
+def test_read_event_counts(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+    db: Session,
+) -> None:
+    event_type = random_lower_string()
+    now = datetime.utcnow()
+    db.add_all(Event(event_type=event_type, created_at=now) for _ in range(3))
+    db.commit()
+
+    params = {
+        "since": (now - timedelta(days=1)).isoformat(),
+        "granularity": "day",
+        "event_type": event_type,
+    }
+    response = client.get(
+        f"{settings.API_V1_STR}/events/analytics",
+        headers=superuser_token_headers,
+        params=params,
+    )
+    assert response.status_code == 200
+    assert response.json()["data"] == [
+        {
+            "bucket": now.replace(
+                hour=0, minute=0, second=0, microsecond=0
+            ).isoformat(),
+            "event_type": event_type,
+            "organization_id": None,
+            "model_id": None,
+            "count": 3,
+        }
+    ]
+
+    # Non-superusers only see organizations they belong to
+    response = client.get(
+        f"{settings.API_V1_STR}/events/analytics",
+        headers=normal_user_token_headers,
+        params=params,
+    )
+    assert response.status_code == 400
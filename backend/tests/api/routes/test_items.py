@@ -1,10 +1,25 @@
+import csv
+import json
+import time
 import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, col, select
 
+from app import crud
+from app.api.routes import items as items_routes
+from app.core import db
+from app.core.cache import invalidate_user, recent_writers
 from app.core.config import settings
+from app.models import Event, MembershipRole, Organization, OrganizationMembership
 from tests.utils.item import create_random_item
+from tests.utils.utils import random_lower_string
 
 
 def test_create_item(
@@ -65,6 +80,55 @@ def test_read_item_not_enough_permissions(
     assert content["detail"] == "Not enough permissions"
 
 
+def test_read_item_organization_member(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    user = crud.get_user_by_email(session=db, email=settings.EMAIL_TEST_USER)
+    assert user
+    organization = Organization(name="Shared", slug=random_lower_string())
+    db.add(organization)
+    db.commit()
+    membership = OrganizationMembership(
+        user_id=user.id, organization_id=organization.id, role=MembershipRole.viewer
+    )
+    db.add(membership)
+    item = create_random_item(db)
+    item.organization_id = organization.id
+    db.add(item)
+    db.commit()
+    invalidate_user(user.id)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/{item.id}", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["organization_id"] == str(organization.id)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert str(item.id) in [data["id"] for data in content["data"]]
+    assert content["count"] == len(content["data"])
+    # Counters are per owner, so members get estimates for cached counts too
+    for mode in ("estimated", "cached"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            params={"count_mode": mode},
+        )
+        assert response.status_code == 200
+        assert response.json()["count_mode"] == "estimated"
+
+    db.delete(membership)
+    db.commit()
+    invalidate_user(user.id)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/{item.id}", headers=normal_user_token_headers
+    )
+    assert response.status_code == 400
+
+
 def test_read_items(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -79,6 +143,173 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+def test_read_items_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        create_random_item(db)
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params: dict[str, str | int] = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        content = response.json()
+        assert len(content["data"]) <= 2
+        seen.extend(item["id"] for item in content["data"])
+        cursor = content["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen))
+    assert len(seen) == content["count"]
+
+
+def test_read_items_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_read_items_count_modes(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    for title in ("Foo", "Bar"):
+        client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"type": "generic", "title": title},
+        )
+    counts = {}
+    for mode in ("exact", "cached", "estimated", "none"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            params={"count_mode": mode},
+        )
+        assert response.status_code == 200
+        content = response.json()
+        assert content["count_mode"] == mode
+        counts[mode] = content["count"]
+    assert counts["exact"] >= 2
+    assert counts["cached"] == counts["exact"]
+    assert counts["estimated"] >= 0
+    assert counts["none"] is None
+
+
+def test_read_items_estimated_count_with_filters(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    for meta in ('{"a": 1}', "a:1", "a"):
+        for mode in ("estimated", "cached"):
+            response = client.get(
+                f"{settings.API_V1_STR}/items/",
+                headers=superuser_token_headers,
+                params={"meta": meta, "count_mode": mode},
+            )
+            assert response.status_code == 200
+            assert response.json()["count_mode"] == "estimated"
+            assert response.json()["count"] >= 0
+    response = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"extras": '{"a": 1}', "count_mode": "estimated"},
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] >= 0
+
+
+def test_read_items_sparse_fields(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"fields": "id,title", "limit": 1},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert set(content["data"][0]) == {"id", "title"}
+    assert content["next_cursor"]
+    assert content["count_mode"] == "exact"
+
+
+def test_read_item_sparse_fields(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/{item.id}",
+        headers=superuser_token_headers,
+        params={"fields": "title,meta_data"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"title": item.title, "meta_data": {}}
+
+
+def test_read_items_unknown_field(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"fields": "id,hashed_password"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: hashed_password"
+
+
+def test_read_item_etag(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    url = f"{settings.API_V1_STR}/items/{item.id}"
+    response = client.get(url, headers=superuser_token_headers)
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    headers = {**superuser_token_headers, "If-None-Match": etag}
+    response = client.get(url, headers=headers)
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    client.put(url, headers=superuser_token_headers, json={"title": "Changed"})
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_read_items_etag(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    response = client.get(url, headers=normal_user_token_headers)
+    etag = response.headers["etag"]
+    headers = {**normal_user_token_headers, "If-None-Match": etag}
+    assert client.get(url, headers=headers).status_code == 304
+
+    client.post(
+        url,
+        headers=normal_user_token_headers,
+        json={"type": "generic", "title": "New"},
+    )
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -97,6 +328,91 @@ def test_update_item(
     assert content["owner_id"] == str(item.owner_id)
 
 
+def test_write_item_single_statement(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    # Warm up the user cache so authentication adds no query
+    client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    response = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"type": "generic", "title": "One statement"},
+    )
+    assert response.status_code == 200
+    assert response.headers["X-DB-Queries"] == "1"
+    response = client.put(
+        f"{settings.API_V1_STR}/items/{response.json()['id']}",
+        headers=normal_user_token_headers,
+        json={"title": "Still one statement"},
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Still one statement"
+    assert response.json()["updated_at"] is not None
+    assert response.headers["X-DB-Queries"] == "1"
+
+
+def test_write_item_audit_events(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    me = client.get(
+        f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers
+    ).json()
+    with patch.object(settings, "AUDIT_ENABLED", True):
+        response = client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"type": "generic", "title": "Audited", "description": "Long"},
+        )
+        assert response.status_code == 200
+        # The event is written alongside the item
+        assert response.headers["X-DB-Queries"] == "2"
+        id = response.json()["id"]
+        response = client.put(
+            f"{settings.API_V1_STR}/items/{id}",
+            headers=normal_user_token_headers,
+            json={"title": "Audited again", "description": "Longer"},
+        )
+        assert response.status_code == 200
+        response = client.patch(
+            f"{settings.API_V1_STR}/items/bulk",
+            headers=normal_user_token_headers,
+            json=[{"id": id, "title": "Renamed", "description": "Longest"}],
+        )
+        assert response.status_code == 200
+        assert response.json()["errors"] == []
+        response = client.request(
+            "DELETE",
+            f"{settings.API_V1_STR}/items/bulk",
+            headers=normal_user_token_headers,
+            json=[id],
+        )
+        assert response.status_code == 200
+
+    events = db.exec(
+        select(Event)
+        .where(Event.payload["id"].astext == id)
+        .order_by(col(Event.created_at))
+    ).all()
+    assert [(event.event_type, event.payload) for event in events] == [
+        (
+            "item.created",
+            {
+                "id": id,
+                "values": {
+                    "type": "generic",
+                    "title": "Audited",
+                    "owner_id": me["id"],
+                    "organization_id": None,
+                },
+            },
+        ),
+        ("item.updated", {"id": id, "changes": {"title": "Audited again"}}),
+        ("item.updated", {"id": id, "changes": {"title": "Renamed"}}),
+        ("item.deleted", {"id": id}),
+    ]
+    assert all(str(event.actor_id) == me["id"] for event in events)
+
+
 def test_update_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -162,3 +478,314 @@ def test_delete_item_not_enough_permissions(
     assert response.status_code == 400
     content = response.json()
     assert content["detail"] == "Not enough permissions"
+
+
+def test_create_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    data = [
+        {"type": "generic", "title": f"Bulk {i}", "meta_data": {"n": i}}
+        for i in range(3)
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["errors"] == []
+    assert [item["title"] for item in content["data"]] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    assert content["data"][2]["meta_data"] == {"n": 2}
+
+
+def test_update_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"type": "generic", "title": "Mine"} for _ in range(3)],
+    )
+    own_ids = [item["id"] for item in response.json()["data"]]
+    other_item = create_random_item(db)
+    missing_id = str(uuid.uuid4())
+    data = [
+        {"id": own_ids[0], "title": "Renamed"},
+        {"id": own_ids[1], "description": "Described", "meta_data": {"a": 1}},
+        {"id": str(other_item.id), "title": "Stolen"},
+        {"id": missing_id, "title": "Ghost"},
+        {"id": own_ids[2], "title": None, "type": None, "description": None},
+    ]
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["id"] for item in content["data"]] == own_ids[:2]
+    assert content["data"][0]["title"] == "Renamed"
+    assert content["data"][1]["title"] == "Mine"
+    assert content["data"][1]["meta_data"] == {"a": 1}
+    assert content["data"][1]["updated_at"] is not None
+    errors = {error["index"]: error for error in content["errors"]}
+    assert errors[2]["status_code"] == 400
+    assert errors[3]["status_code"] == 404
+    assert errors[4]["status_code"] == 400
+    assert errors[4]["detail"] == "Fields cannot be null: type, title"
+    db.refresh(other_item)
+    assert other_item.title != "Stolen"
+
+
+def test_delete_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[{"type": "generic", "title": "Doomed"}],
+    )
+    own_id = response.json()["data"][0]["id"]
+    other_item = create_random_item(db)
+    response = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json=[own_id, str(other_item.id)],
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["ids"] == [own_id]
+    assert content["errors"][0]["index"] == 1
+    assert content["errors"][0]["detail"] == "Not enough permissions"
+
+
+def test_export_items_ndjson(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"type": "generic", "title": "Exported", "meta_data": {"k": "v"}},
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    listed = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"limit": 1000},
+    ).json()
+    assert [row["id"] for row in rows] == [item["id"] for item in listed["data"]]
+    assert {"k": "v"} in [row["meta_data"] for row in rows]
+
+
+def test_export_items_csv(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=superuser_token_headers,
+        params={"format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(response.text.splitlines()))
+    exported = next(row for row in rows if row["id"] == str(item.id))
+    assert exported["title"] == item.title
+    assert json.loads(exported["meta_data"]) == {}
+
+
+def test_export_items_releases_request_session(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    me = client.get(
+        f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers
+    ).json()
+    export_rows = items_routes._export_rows
+    checked_out: list[int] = []
+
+    async def wrapped(*args: Any) -> AsyncIterator[str]:
+        checked_out.append(db.async_engine.pool.checkedout())  # type: ignore[attr-defined]
+        async for chunk in export_rows(*args):
+            yield chunk
+
+    # Authenticate with a query, not from the cache
+    invalidate_user(uuid.UUID(me["id"]))
+    with patch.object(items_routes, "_export_rows", wrapped):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/export",
+            headers=normal_user_token_headers,
+        )
+    assert response.status_code == 200
+    assert checked_out == [0]
+
+
+def test_read_items_meta_filters(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    tag = random_lower_string()
+    matching = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={
+            "type": "generic",
+            "title": "Tagged",
+            "meta_data": {"tag": tag, "stats": {"views": 3}, "draft": True},
+        },
+    ).json()
+    client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"type": "generic", "title": "Tagged", "meta_data": {"tag": tag}},
+    )
+
+    for meta in (
+        [json.dumps({"tag": tag, "draft": True})],
+        [f"tag:{tag}", "stats.views:3"],
+        [f"tag:{tag}", "stats.views"],
+    ):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            params={"meta": meta},
+        )
+        assert response.status_code == 200
+        content = response.json()
+        assert [item["id"] for item in content["data"]] == [matching["id"]]
+        assert content["count"] == 1
+
+
+def test_read_items_meta_filter_invalid(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"meta": "{not json"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid filter: {not json"
+
+
+def test_read_items_replica_routing(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    # The primary database stands in for the replica; queries are told apart
+    # by the engine that ran them
+    replica = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    statements: list[str] = []
+
+    @event.listens_for(replica.sync_engine, "before_cursor_execute")
+    def record(_conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+        statements.append(statement)
+
+    recent_writers.clear()
+    client.cookies.clear()
+    try:
+        with patch.object(db, "replica_async_engine", replica):
+            r = client.get(
+                f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers
+            )
+            assert r.status_code == 200
+            assert statements
+
+            statements.clear()
+            r = client.post(
+                f"{settings.API_V1_STR}/items/",
+                headers=normal_user_token_headers,
+                json={"type": "generic", "title": "Fresh"},
+            )
+            assert r.status_code == 200
+            id = r.json()["id"]
+            # Right after writing, the user reads their item from the primary
+            r = client.get(
+                f"{settings.API_V1_STR}/items/{id}", headers=normal_user_token_headers
+            )
+            assert r.status_code == 200
+            assert not statements
+
+            # Another worker, unaware of the write, still honors the cookie
+            recent_writers.clear()
+            r = client.get(
+                f"{settings.API_V1_STR}/items/{id}", headers=normal_user_token_headers
+            )
+            assert r.status_code == 200
+            assert not statements
+
+            # Windows longer than REPLICA_STICKY_SECONDS are not trusted
+            client.cookies.set("read_primary_until", str(time.time() + 3600))
+            r = client.get(
+                f"{settings.API_V1_STR}/items/{id}", headers=normal_user_token_headers
+            )
+            assert r.status_code == 200
+            assert statements
+    finally:
+        client.cookies.clear()
+        client.portal.call(replica.dispose)
+
+
+def test_read_items_single_connection(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    me = client.get(
+        f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers
+    ).json()
+    pool = db.async_engine.sync_engine.pool
+    checked_out = max_checked_out = sync_checkouts = 0
+
+    def on_checkout(*_args: Any) -> None:
+        nonlocal checked_out, max_checked_out
+        checked_out += 1
+        max_checked_out = max(max_checked_out, checked_out)
+
+    def on_checkin(*_args: Any) -> None:
+        nonlocal checked_out
+        checked_out -= 1
+
+    def on_sync_checkout(*_args: Any) -> None:
+        nonlocal sync_checkouts
+        sync_checkouts += 1
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+    # The principal is loaded on the async pool; reads must not add the sync one
+    event.listen(db.engine.pool, "checkout", on_sync_checkout)
+    try:
+        for url in ["/items/", "/users/me", "/events/", "/search/items?q=x"]:
+            # Authenticate with a query, not from the cache
+            invalidate_user(uuid.UUID(me["id"]))
+            response = client.get(
+                f"{settings.API_V1_STR}{url}", headers=normal_user_token_headers
+            )
+            assert response.status_code == 200
+            assert max_checked_out == 1, url
+            assert sync_checkouts == 0, url
+            max_checked_out = 0
+    finally:
+        event.remove(pool, "checkout", on_checkout)
+        event.remove(pool, "checkin", on_checkin)
+        event.remove(db.engine.pool, "checkout", on_sync_checkout)
+
+
+def test_read_items_query_stats(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    with patch.object(settings, "REPEATED_QUERY_WARNING_THRESHOLD", 0):
+        r = client.get(f"{settings.API_V1_STR}/items/", headers=superuser_token_headers)
+    assert r.status_code == 200
+    queries = int(r.headers["X-DB-Queries"])
+    # At least the count and the page
+    assert queries >= 2
+    assert r.headers["Server-Timing"].startswith("db;dur=")
+    assert f'desc="{queries} queries"' in r.headers["Server-Timing"]
+    # With a threshold of 0 every statement counts as repeated
+    assert "ran the same statement 1 times" in caplog.text
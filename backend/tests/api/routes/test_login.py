@@ -4,9 +4,10 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.hashing import hashing_pool
+from app.core.security import make_pwd_context, verify_password
 from app.crud import create_user
-from app.models import UserCreate
+from app.models import User, UserCreate
 from app.utils import generate_password_reset_token
 from tests.utils.user import user_authentication_headers
 from tests.utils.utils import random_email, random_lower_string
@@ -33,6 +34,48 @@ def test_get_access_token_incorrect_password(client: TestClient) -> None:
     assert r.status_code == 400
 
 
+def test_get_access_token_hashing_pool_full(client: TestClient) -> None:
+    login_data = {
+        "username": settings.FIRST_SUPERUSER,
+        "password": settings.FIRST_SUPERUSER_PASSWORD,
+    }
+    with (
+        patch.object(hashing_pool, "max_workers", 0),
+        patch.object(hashing_pool, "max_queue", 0),
+    ):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == str(settings.HASHING_RETRY_AFTER_SECONDS)
+
+
+def test_get_access_token_rehashes_outdated_hash(
+    client: TestClient, db: Session
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    outdated_hash = make_pwd_context("bcrypt", bcrypt_rounds=4).hash(password)
+    user = User(email=email, hashed_password=outdated_hash)
+    db.add(user)
+    db.commit()
+
+    login_data = {"username": email, "password": password}
+    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 200
+    db.refresh(user)
+    assert user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS}$")
+    assert verify_password(password, user.hashed_password)
+
+
+def test_get_access_token_rate_limited(client: TestClient) -> None:
+    login_data = {"username": random_email(), "password": random_lower_string()}
+    for _ in range(settings.LOGIN_RATE_LIMIT_PER_USERNAME):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+        assert r.status_code == 400
+    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+
+
 def test_use_access_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -61,6 +104,16 @@ def test_recovery_password(
         assert r.json() == {"message": "Password recovery email sent"}
 
 
+def test_recovery_password_rate_limited(client: TestClient) -> None:
+    email = random_email()
+    for _ in range(settings.PASSWORD_RECOVERY_RATE_LIMIT_PER_EMAIL):
+        r = client.post(f"{settings.API_V1_STR}/password-recovery/{email}")
+        assert r.status_code == 404
+    r = client.post(f"{settings.API_V1_STR}/password-recovery/{email}")
+    assert r.status_code == 429
+    assert "Retry-After" in r.headers
+
+
 def test_recovery_password_user_not_exits(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -0,0 +1,149 @@
+import time
+from typing import Any
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.db import slow_query_log
+from app.core.event_sink import event_sink
+from app.core.slow_queries import fingerprint
+
+
+def test_read_hashing_metrics(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/metrics/hashing", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["workers"] == settings.HASHING_POOL_SIZE
+    # Logging in for the superuser headers went through the pool
+    assert stats["completed"] >= 1
+    assert stats["avg_run_ms"] > 0
+
+
+def test_read_hashing_metrics_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/metrics/hashing", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_read_cache_metrics(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    def token_stats() -> dict[str, float]:
+        r = client.get(
+            f"{settings.API_V1_STR}/metrics/caches", headers=superuser_token_headers
+        )
+        assert r.status_code == 200
+        return next(stats for stats in r.json() if stats["name"] == "tokens")
+
+    before = token_stats()
+    after = token_stats()
+    # The repeated token was served from the cache
+    assert after["hits"] > before["hits"]
+    assert after["misses"] == before["misses"]
+    assert after["size"] >= 1
+
+
+def test_read_pool_metrics(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/metrics/pools", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    pools = {stats["name"]: stats for stats in r.json()}
+    assert set(pools) == {"sync", "async"}
+    stats = pools["async"]
+    assert stats["size"] == settings.DB_POOL_SIZE
+    assert stats["max_overflow"] == settings.DB_MAX_OVERFLOW
+    # Authenticating this request checked out an async connection
+    assert stats["checkouts"] >= 1
+    assert stats["checked_out"] >= 0
+    assert stats["connects"] >= 1
+    assert stats["timeouts"] == 0
+
+
+def test_read_event_sink_metrics(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    def sink_stats() -> dict[str, int]:
+        r = client.get(
+            f"{settings.API_V1_STR}/metrics/events", headers=superuser_token_headers
+        )
+        assert r.status_code == 200
+        return r.json()
+
+    before = sink_stats()
+    client.post(
+        f"{settings.API_V1_STR}/events/batch",
+        headers=superuser_token_headers,
+        json=[{"event_type": "metrics.test"}],
+    )
+    assert sink_stats()["accepted"] == before["accepted"] + 1
+    client.portal.call(event_sink.flush)
+    after = sink_stats()
+    assert after["flushed"] >= before["flushed"] + 1
+    assert after["buffered"] == 0
+
+
+def test_read_slow_queries(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    slow_query_log.clear()
+    with patch.object(slow_query_log, "threshold_ms", 0):
+        r = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+        )
+    assert r.status_code == 200
+
+    def read_items_query() -> dict[str, Any] | None:
+        r = client.get(
+            f"{settings.API_V1_STR}/metrics/slow-queries",
+            headers=superuser_token_headers,
+        )
+        assert r.status_code == 200
+        return next(
+            (
+                stats
+                for stats in r.json()
+                if stats["fingerprint"].startswith("SELECT item.")
+                and "LIMIT ?" in stats["fingerprint"]
+            ),
+            None,
+        )
+
+    stats = read_items_query()
+    assert stats is not None
+    assert stats["calls"] == 1
+    assert stats["total_ms"] >= stats["max_ms"] > 0
+    # The plan is captured in the background
+    deadline = time.monotonic() + 5
+    while stats["plan"] is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+        stats = read_items_query()
+        assert stats is not None
+    assert "actual time" in stats["plan"]
+
+
+def test_slow_query_fingerprint() -> None:
+    assert (
+        fingerprint(
+            "SELECT *  FROM item\n WHERE id IN (%(id_1_1)s, %(id_1_2)s) "
+            "AND title = 'a''b' LIMIT 10"
+        )
+        == "SELECT * FROM item WHERE id IN (...) AND title = ? LIMIT ?"
+    )
+    assert (
+        fingerprint(
+            "INSERT INTO tag (name) VALUES (%(name_m0)s), (%(name_m1)s), (%(name_m2)s)"
+        )
+        == "INSERT INTO tag (name) VALUES (?), ..."
+    )
@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Content
+from tests.utils.item import create_random_item
+from tests.utils.utils import random_lower_string
+
+
+def test_search_items(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    word = random_lower_string()
+    titled = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"type": "generic", "title": f"About {word}"},
+    ).json()
+    described = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"type": "generic", "title": "Other", "description": f"Mentions {word}"},
+    ).json()
+    other_owner = create_random_item(db)
+    db.add(Content(item_id=other_owner.id, role="user", text=f"Also {word}"))
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/search/items",
+        headers=normal_user_token_headers,
+        params={"q": word},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [hit["id"] for hit in content["data"]] == [titled["id"], described["id"]]
+    assert content["data"][0]["rank"] > content["data"][1]["rank"]
+    assert content["next_cursor"] is None
+
+
+def test_search_items_content_and_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    word = random_lower_string()
+    items = [create_random_item(db) for _ in range(3)]
+    for item in items:
+        db.add(Content(item_id=item.id, role="user", text=f"Talks about {word}"))
+    db.commit()
+
+    seen: list[str] = []
+    cursor = None
+    for _ in range(3):
+        params: dict[str, str | int] = {"q": word, "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            f"{settings.API_V1_STR}/search/items",
+            headers=superuser_token_headers,
+            params=params,
+        )
+        content = response.json()
+        seen.extend(hit["id"] for hit in content["data"])
+        cursor = content["next_cursor"]
+    assert sorted(seen) == sorted(str(item.id) for item in items)
+    assert cursor is None
@@ -8,6 +8,7 @@ from app import crud
 from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User, UserCreate
+from tests.utils.user import user_authentication_headers
 from tests.utils.utils import random_email, random_lower_string
 
 
@@ -33,6 +34,21 @@ def test_get_users_normal_user_me(
     assert current_user["email"] == settings.EMAIL_TEST_USER
 
 
+def test_get_users_me_etag(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/users/me"
+    etag = client.get(url, headers=normal_user_token_headers).headers["etag"]
+    headers = {**normal_user_token_headers, "If-None-Match": etag}
+    r = client.get(url, headers=headers)
+    assert r.status_code == 304
+
+    client.patch(url, headers=normal_user_token_headers, json={"full_name": "Etag"})
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["full_name"] == "Etag"
+
+
 def test_create_user_new_email(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -168,6 +184,65 @@ def test_retrieve_users(
         assert "email" in item
 
 
+def test_retrieve_users_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(2):
+        user_in = UserCreate(email=random_email(), password=random_lower_string())
+        crud.create_user(session=db, user_create=user_in)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"limit": 1},
+    )
+    first_page = r.json()
+    assert len(first_page["data"]) == 1
+    assert first_page["next_cursor"]
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"limit": 1, "cursor": first_page["next_cursor"]},
+    )
+    second_page = r.json()
+    assert len(second_page["data"]) == 1
+    assert second_page["data"][0]["id"] != first_page["data"][0]["id"]
+
+
+def test_retrieve_users_sparse_fields(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"fields": "email"},
+    )
+    assert r.status_code == 200
+    all_users = r.json()
+    assert all_users["data"]
+    for user in all_users["data"]:
+        assert set(user) == {"email"}
+
+
+def test_retrieve_users_extras_filter(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    team = random_lower_string()
+    user_in = UserCreate(
+        email=random_email(), password=random_lower_string(), extras={"team": team}
+    )
+    user = crud.create_user(session=db, user_create=user_in)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"extras": f"team:{team}"},
+    )
+    assert r.status_code == 200
+    assert [u["id"] for u in r.json()["data"]] == [str(user.id)]
+
+
 def test_update_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -346,6 +421,33 @@ def test_update_user(
     assert user_db.full_name == "Updated_full_name"
 
 
+def test_deactivate_user_invalidates_cache(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    username = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=username, password=password)
+    user = crud.create_user(session=db, user_create=user_in)
+    headers = user_authentication_headers(
+        client=client, email=username, password=password
+    )
+    # Two reads: the first fills the user cache, the second is served by it
+    for _ in range(2):
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+        assert r.status_code == 200
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert r.status_code == 200
+
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
+
+
 def test_update_user_not_exists(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -6,6 +6,7 @@ from sqlmodel import Session, delete
 
 from app.core.config import settings
 from app.core.db import engine, init_db
+from app.core.rate_limit import InMemoryRateLimitBackend, rate_limit_backend
 from app.main import app
 from app.models import Item, User
 from tests.utils.user import authentication_token_from_email
@@ -40,3 +41,11 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits() -> None:
+    # Every test starts with full buckets; the suite logs in far more often
+    # than the production limits allow
+    assert isinstance(rate_limit_backend, InMemoryRateLimitBackend)
+    rate_limit_backend.clear()
@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from sqlmodel import Session, col, select, update
+
+from app.core.config import settings
+from app.models import Event, Organization
+from tests.utils.utils import random_lower_string
+
+
+def audit_events(db: Session, organization_id: object) -> list[tuple[str, dict]]:
+    events = db.exec(
+        select(Event)
+        .where(Event.payload["id"].astext == str(organization_id))
+        .order_by(col(Event.created_at))
+    ).all()
+    return [(event.event_type, event.payload) for event in events]
+
+
+def test_audit_unit_of_work(db: Session) -> None:
+    slug = random_lower_string()
+    with patch.object(settings, "AUDIT_ENABLED", True):
+        organization = Organization(name="Acme", slug=slug, meta_data={"big": "x"})
+        db.add(organization)
+        db.commit()
+        organization_id = organization.id
+
+        organization.name = "Acme Inc"
+        organization.meta_data = {"big": "y"}
+        db.commit()
+        # Changes outside the allow-list are not recorded
+        organization.meta_data = {"big": "z"}
+        db.commit()
+
+    assert audit_events(db, organization_id) == [
+        (
+            "organization.created",
+            {
+                "id": str(organization_id),
+                "values": {"name": "Acme", "slug": slug, "plan_type": "free"},
+            },
+        ),
+        (
+            "organization.updated",
+            {"id": str(organization_id), "changes": {"name": "Acme Inc"}},
+        ),
+    ]
+
+    with patch.object(settings, "AUDIT_ENABLED", True):
+        db.delete(organization)
+        db.commit()
+    # Deleting the organization cascades to its events; the new one does not
+    # point to it
+    assert audit_events(db, organization_id) == [
+        ("organization.deleted", {"id": str(organization_id)})
+    ]
+
+
+def test_audit_disabled(db: Session) -> None:
+    organization = Organization(name="Acme", slug=random_lower_string())
+    db.add(organization)
+    db.commit()
+    assert audit_events(db, organization.id) == []
+
+
+def test_audit_update_statement(db: Session) -> None:
+    organization = Organization(name="Acme", slug=random_lower_string())
+    db.add(organization)
+    db.commit()
+    organization_id = organization.id
+    where = col(Organization.id) == organization_id
+
+    with patch.object(settings, "AUDIT_ENABLED", True):
+        for statement in [
+            update(Organization).where(where).values(name="Acme Inc"),
+            # Values that are expressions have no bound parameter
+            update(Organization)
+            .where(where)
+            .values(name=col(Organization.name) + " Ltd"),
+            update(Organization)
+            .where(where)
+            .ordered_values(
+                (col(Organization.name), "Acme"), (col(Organization.meta_data), {})
+            ),
+        ]:
+            db.exec(statement.returning(Organization))
+            db.commit()
+
+    assert audit_events(db, organization_id) == [
+        (
+            "organization.updated",
+            {"id": str(organization_id), "changes": {"name": name}},
+        )
+        for name in ["Acme Inc", "Acme Inc Ltd", "Acme"]
+    ]
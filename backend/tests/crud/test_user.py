@@ -2,7 +2,8 @@ from fastapi.encoders import jsonable_encoder
 from sqlmodel import Session
 
 from app import crud
-from app.core.security import verify_password
+from app.core.config import settings
+from app.core.security import make_pwd_context, verify_password
 from app.models import User, UserCreate, UserUpdate
 from tests.utils.utils import random_email, random_lower_string
 
@@ -26,6 +27,22 @@ def test_authenticate_user(db: Session) -> None:
     assert user.email == authenticated_user.email
 
 
+def test_authenticate_user_upgrades_outdated_hash(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    outdated_hash = make_pwd_context("bcrypt", bcrypt_rounds=4).hash(password)
+    user = User(email=email, hashed_password=outdated_hash)
+    db.add(user)
+    db.commit()
+
+    authenticated_user = crud.authenticate(session=db, email=email, password=password)
+    assert authenticated_user
+    db.refresh(user)
+    assert user.hashed_password != outdated_hash
+    assert user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS}$")
+    assert verify_password(password, user.hashed_password)
+
+
 def test_not_authenticate_user(db: Session) -> None:
     email = random_email()
     password = random_lower_string()
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.core.db import engine
+from app.core.partitions import (
+    create_partitions,
+    drop_expired_partitions,
+    existing_partitions,
+)
+
+
+def test_create_and_drop_partitions() -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        created = create_partitions(conn, now=datetime(2000, 1, 10), months_ahead=1)
+        assert created == ["event_2000_01", "event_2000_02"]
+        assert create_partitions(conn, now=datetime(2000, 1, 31), months_ahead=1) == []
+
+        conn.execute(
+            text(
+                "INSERT INTO event (id, created_at, event_type, payload) "
+                "VALUES (gen_random_uuid(), '2000-02-03', 'test.old', '{}')"
+            )
+        )
+        partition = conn.execute(
+            text(
+                "SELECT tableoid::regclass::text FROM event WHERE event_type = 'test.old'"
+            )
+        ).scalar_one()
+        assert partition == "event_2000_02"
+
+        # February is kept until a whole retention month has passed after it
+        dropped = drop_expired_partitions(
+            conn, now=datetime(2000, 3, 31), retention_months=1
+        )
+        assert dropped == ["event_2000_01"]
+        dropped = drop_expired_partitions(
+            conn, now=datetime(2000, 4, 1), retention_months=1
+        )
+        assert dropped == ["event_2000_02"]
+        partitions = existing_partitions(conn)
+        assert all(month.year > 2000 for month in partitions)
+        assert not conn.execute(
+            text("SELECT count(*) FROM event WHERE event_type = 'test.old'")
+        ).scalar_one()
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, col, delete, select
+
+from app.core.db import engine
+from app.core.rollups import EVENT_ROLLUP, event_counts, refresh_event_rollups
+from app.models import (
+    Event,
+    EventDailyCount,
+    EventGranularity,
+    EventHourlyCount,
+    EventRollupState,
+)
+from tests.utils.utils import random_lower_string
+
+
+def test_refresh_event_rollups(db: Session) -> None:
+    event_type = random_lower_string()
+    base = datetime(2001, 1, 1)
+    db.add_all(
+        Event(event_type=event_type, created_at=base + timedelta(minutes=minutes))
+        for minutes in (10, 20, 70, 130)
+    )
+    state = db.get(EventRollupState, EVENT_ROLLUP)
+    assert state is not None
+    watermark = state.watermark
+    state.watermark = base
+    db.commit()
+    try:
+        with engine.connect() as conn:
+            # Two windows, so the first one commits before the second runs
+            refreshed = refresh_event_rollups(
+                conn,
+                now=base + timedelta(hours=2),
+                lag=timedelta(0),
+                window=timedelta(hours=1),
+            )
+        assert refreshed == base + timedelta(hours=2)
+
+        hourly = db.exec(
+            select(EventHourlyCount)
+            .where(EventHourlyCount.event_type == event_type)
+            .order_by(col(EventHourlyCount.bucket))
+        ).all()
+        assert [(row.bucket, row.event_count) for row in hourly] == [
+            (base, 2),
+            (base + timedelta(hours=1), 1),
+        ]
+        daily = db.exec(
+            select(EventDailyCount).where(EventDailyCount.event_type == event_type)
+        ).all()
+        assert [(row.bucket, row.event_count) for row in daily] == [(base, 3)]
+
+        # The event past the watermark is counted from the event table
+        counts = db.execute(
+            event_counts(
+                EventGranularity.hour,
+                start=base,
+                end=base + timedelta(hours=3),
+                event_type=event_type,
+            )
+        ).all()
+        assert [(row.bucket, row.count) for row in counts] == [
+            (base, 2),
+            (base + timedelta(hours=1), 1),
+            (base + timedelta(hours=2), 1),
+        ]
+    finally:
+        state.watermark = watermark
+        for model in (Event, EventHourlyCount, EventDailyCount):
+            db.exec(delete(model).where(col(model.event_type) == event_type))
+        db.commit()